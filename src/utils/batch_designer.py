@@ -0,0 +1,207 @@
+import sys
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from instrumentation import instrumentation
+from slide_model import Slide
+
+# The designer pass, run over many decks at once. Each slide's bullets are measured as
+# wrapped line counts for its layout's text box; slides that provably fit (one-line
+# bullets, or a cheap upper bound on their lines) are passed over without measuring.
+# Organizer output is mostly templates, so decks share most of their bullets and
+# overflowing slides: each distinct bullet is measured, and each distinct slide fitted,
+# once. Fitting shortens over-long bullets, merges short neighbours and drops bullets,
+# evenly across a slide's labelled sections, until the slide fits.
+
+VISUAL_ELEMENTS = "Corporate template with consistent branding"
+
+DESIGN_NOTES = {
+    slide_type: sys.intern(f"Professional layout optimized for {slide_type} content")
+    for slide_type in ("title", "content", "closing")
+}
+
+# Most bullets a slide keeps, whatever their length
+MAX_BULLETS = 6
+# Most wrapped lines one bullet may take before it is shortened
+MAX_BULLET_LINES = 3
+
+class TextBox(NamedTuple):
+    """Bullet capacity of a layout's body placeholder at the smallest font autofit may use (20pt)"""
+    chars_per_line: int
+    max_lines: int
+
+# From the body placeholders pptx_export renders: the full-width box is 828pt x 343pt and
+# the two-column layout puts text in a 408pt-wide half; 20pt text averages about 10pt per
+# character after the bullet indent, and a line with paragraph spacing takes about 30pt.
+TEXT_BOXES: Dict[str, TextBox] = {
+    "content": TextBox(80, 11),
+    "content_with_image": TextBox(39, 11),
+}
+# Title slides only render their subtitle, so their bullets are not fitted
+_UNFITTED_LAYOUTS = frozenset(("title",))
+
+# Entries each measurement cache keeps before it is cleared
+CACHE_SIZE = 65536
+# Wrapped line counts per box width, and fitted bullets per (box, bullets); shared by every
+# call in the process, since decks for the same topic repeat across batches
+_measured: Dict[int, Dict[str, int]] = {}
+_fitted: Dict[Tuple[TextBox, Tuple[str, ...]], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+_ELLIPSIS = "…"
+_MERGE_SEPARATOR = "; "
+
+def wrapped_lines(text: str, width: int) -> int:
+    """Lines text takes when word-wrapped at width characters"""
+    if len(text) <= width:
+        return 1
+    if "  " in text or "\n" in text or "\t" in text:
+        text = " ".join(text.split())
+    text = text.strip()
+    # Jump a line at a time to the last space that still fits, breaking words longer than a line
+    lines, start, end = 1, 0, len(text)
+    while end - start > width:
+        space = text.rfind(" ", start, start + width + 1)
+        start = space + 1 if space > start else start + width
+        lines += 1
+    return lines
+
+def shorten(text: str, width: int, max_lines: int) -> str:
+    """Cut text at a word boundary, with an ellipsis, so it wraps to at most max_lines"""
+    if wrapped_lines(text, width) <= max_lines:
+        return text
+    # Fill the lines greedily, keeping room for the ellipsis on the last one
+    kept: List[str] = []
+    lines, used = 1, 0
+    for word in text.split():
+        length = len(word) + (1 if used else 0)
+        if used + length > width:
+            if lines == max_lines or len(word) > width:
+                break
+            lines, used, length = lines + 1, 0, len(word)
+        if lines == max_lines and used + length + len(_ELLIPSIS) > width:
+            break
+        kept.append(word)
+        used += length
+    if not kept:
+        # The first word alone overflows; break it mid-word
+        return text.split()[0][:width * max_lines - len(_ELLIPSIS)] + _ELLIPSIS
+    return " ".join(kept).rstrip(",;:.") + _ELLIPSIS
+
+def fit_bullets(content: Sequence[str], box: TextBox, lines: Sequence[int]) -> Tuple[List[str], Dict[str, int]]:
+    """Fit one slide's bullets (with their wrapped line counts) into box; returns them and edit counts"""
+    width = box.chars_per_line
+    bullets = list(content)
+    lines = list(lines)
+    edits = {"bullets_shortened": 0, "bullets_merged": 0, "bullets_truncated": 0}
+
+    for i, count in enumerate(lines):
+        if count > MAX_BULLET_LINES:
+            bullets[i] = shorten(bullets[i], width, MAX_BULLET_LINES)
+            lines[i] = wrapped_lines(bullets[i], width)
+            edits["bullets_shortened"] += 1
+
+    # Adjacent bullets that share a line are merged before anything is dropped; a
+    # "Label:" bullet heads the bullets after it and is never merged
+    i = 0
+    while len(bullets) > MAX_BULLETS or sum(lines) > box.max_lines:
+        if i + 1 >= len(bullets):
+            break
+        if lines[i] == 1 and lines[i + 1] == 1 and not bullets[i].endswith(":") and not bullets[i + 1].endswith(":"):
+            merged = bullets[i].rstrip(".") + _MERGE_SEPARATOR + bullets[i + 1]
+            if len(merged) <= width:
+                bullets[i:i + 2] = [merged]
+                lines[i:i + 2] = [1]
+                edits["bullets_merged"] += 1
+                continue
+        i += 1
+
+    # Drop bullets evenly across the "Label:" sections: from the section with the most
+    # bullets under its heading (the later one on a tie), then whole sections, last first,
+    # once every section is down to one bullet
+    sections: List[List[int]] = []
+    for i, bullet in enumerate(bullets):
+        if not sections or bullet.endswith(":"):
+            sections.append([i])
+        else:
+            sections[-1].append(i)
+
+    def body(section: List[int]) -> int:
+        return len(section) - bullets[section[0]].endswith(":")
+
+    count, total = len(bullets), sum(lines)
+    while count > 1 and (count > MAX_BULLETS or total > box.max_lines):
+        section = max(reversed(sections), key=body)
+        if body(section) > 1 or len(sections) == 1:
+            dropped = [section.pop()]
+        else:
+            dropped = sections.pop()
+        count -= len(dropped)
+        total -= sum(lines[i] for i in dropped)
+        edits["bullets_truncated"] += len(dropped)
+    kept = [i for section in sections for i in section]
+    bullets = [bullets[i] for i in kept]
+    lines = [lines[i] for i in kept]
+    # A "Label:" heading left last has lost every bullet under it
+    while edits["bullets_truncated"] and len(bullets) > 1 and bullets[-1].endswith(":"):
+        bullets.pop()
+        lines.pop()
+        edits["bullets_truncated"] += 1
+    return bullets, edits
+
+def design_slides(decks: Sequence[Sequence[Slide]]) -> Dict[str, int]:
+    """
+    Apply the designer pass to the slides of many decks, in place: set design notes and
+    visual elements, then fit every slide's bullets to its layout. Returns edit counts.
+    """
+    stats = {"slides": 0, "slides_fitted": 0, "bullets_shortened": 0, "bullets_merged": 0, "bullets_truncated": 0}
+    for deck in decks:
+        stats["slides"] += len(deck)
+        for slide in deck:
+            slide.design_notes = DESIGN_NOTES.get(slide.slideType) or f"Professional layout optimized for {slide.slideType} content"
+            slide.visual_elements = VISUAL_ELEMENTS
+            content = slide.content
+            if slide.layout in _UNFITTED_LAYOUTS:
+                if len(content) > MAX_BULLETS:
+                    stats["slides_fitted"] += 1
+                    stats["bullets_truncated"] += len(content) - MAX_BULLETS
+                    slide.content = content[:MAX_BULLETS]
+                continue
+
+            box = TEXT_BOXES.get(slide.layout, TEXT_BOXES["content"])
+            width = box.chars_per_line
+            if len(content) <= MAX_BULLETS:
+                # Up to MAX_BULLETS one-line bullets always fit, so most slides stop here
+                longest = max(map(len, content), default=0)
+                if longest <= width:
+                    continue
+                # Greedy wrapping fills any two consecutive lines with at least width characters,
+                # so n characters take at most 2 * (n // width) + 1 lines
+                if 2 * (longest // width) + 1 <= MAX_BULLET_LINES and \
+                        sum(2 * (len(text) // width) + 1 for text in content) <= box.max_lines:
+                    continue
+            cache = _measured.get(width)
+            if cache is None or len(cache) > CACHE_SIZE:
+                cache = _measured[width] = {}
+            lines = [cache[text] if text in cache else cache.setdefault(text, wrapped_lines(text, width))
+                     for text in content]
+            if len(lines) <= MAX_BULLETS and sum(lines) <= box.max_lines and max(lines) <= MAX_BULLET_LINES:
+                continue
+
+            # Decks built from the same templates overflow the same way; fit each distinct slide once
+            key = (box, content)
+            result = _fitted.get(key)
+            if result is None:
+                if len(_fitted) > CACHE_SIZE:
+                    _fitted.clear()
+                bullets, edits = fit_bullets(content, box, lines)
+                result = _fitted[key] = (tuple(bullets), edits)
+            slide.content, edits = result
+            stats["slides_fitted"] += 1
+            for name, count in edits.items():
+                stats[name] += count
+
+    if instrumentation.enabled:
+        instrumentation.count("slides_produced", stats["slides"])
+        for name in ("slides_fitted", "bullets_shortened", "bullets_merged", "bullets_truncated"):
+            if stats[name]:
+                instrumentation.count(name, stats[name])
+    return stats
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from typing import Any, Dict, Optional
+
+from instrumentation import instrumentation, logger
+from result_cache import normalized_key
+from slide_model import Slide
+
+# Crash recovery for long batch runs. Every pipeline stage output is appended to a
+# journal file as one self-checking line, "<crc32> <json>\n", written with a single
+# O_APPEND write (a short write is finished, not dropped) so worker processes can share
+# the file without interleaving records.
+# A crash can at worst leave a torn last line, which fails its checksum and is ignored.
+# Records are keyed by a job id and the deck's inputs; on restart the batch loads the
+# journal, returns finished decks as-is and resumes the others after their last stage.
+
+def job_key(*inputs: Any) -> str:
+    """A stable job id derived from a batch's inputs, so a rerun of the same batch resumes it"""
+    return hashlib.blake2b(json.dumps(inputs, sort_keys=True).encode("utf-8"), digest_size=8).hexdigest()
+
+def deck_key(topic: str, requirements: str = "", num_slides: Optional[int] = None) -> str:
+    """Decks differing only in whitespace share checkpoints"""
+    return normalized_key(topic, requirements or "", num_slides)
+
+def _encode(value: Any) -> Any:
+    # Organizer and designer outputs are slide lists; everything else is plain JSON
+    if isinstance(value, list) and value and all(isinstance(item, Slide) for item in value):
+        return {"__slides__": [slide.to_dict() for slide in value]}
+    return value
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and "__slides__" in value:
+        return [Slide.from_dict(item) for item in value["__slides__"]]
+    return value
+
+class CheckpointJournal:
+    """
+    Append-only journal of pipeline stage outputs for one job.
+
+    record() appends a stage output for a deck; load() returns the stages recorded so
+    far per deck key. With sync, every record is fsynced, which also survives a machine
+    crash; without it records survive a crash of the process.
+    """
+
+    def __init__(self, path: str, job_id: str, sync: bool = False):
+        self.path = path
+        self.job_id = job_id
+        self.sync = sync
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # A torn last line must not swallow the next record
+        size = os.fstat(self._fd).st_size
+        if size:
+            with open(path, "rb") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    self._write(b"\n")
+
+    def record(self, key: str, stage: str, value: Any):
+        """Durably append the output of one stage of a deck"""
+        payload = json.dumps([self.job_id, key, stage, _encode(value)], separators=(",", ":")).encode("utf-8")
+        line = b"%08x %s\n" % (zlib.crc32(payload), payload)
+        with self._lock:
+            self._write(line)
+            if self.sync:
+                os.fsync(self._fd)
+        instrumentation.count("checkpoints_written")
+
+    def _write(self, data: bytes):
+        # os.write may write less than asked (a full disk, a signal); finish the record
+        # rather than leave it torn for the next one to be appended to
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            if not written:
+                raise OSError(f"Could not append to checkpoint journal {self.path}")
+            view = view[written:]
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Map each deck key of this job to its recorded {stage: output}"""
+        progress: Dict[str, Dict[str, Any]] = {}
+        corrupt = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                line = line.rstrip(b"\n")
+                if not line:
+                    continue
+                checksum, _, payload = line.partition(b" ")
+                try:
+                    if int(checksum, 16) != zlib.crc32(payload):
+                        raise ValueError("checksum mismatch")
+                    job_id, key, stage, value = json.loads(payload)
+                except ValueError:
+                    corrupt += 1
+                    continue
+                if job_id == self.job_id:
+                    progress.setdefault(key, {})[stage] = _decode(value)
+        if corrupt:
+            logger.warning("Skipped %d damaged checkpoint records in %s", corrupt, self.path)
+        return progress
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -1,484 +1,1399 @@
 
+import argparse
+import contextlib
+import copy
+import functools
 import json
+import logging
 import sys
-from typing import List, Dict, Any
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, BinaryIO, Callable, Container, ContextManager, Iterable, Iterator, Optional, Sequence, TextIO, Tuple, Union
 import os
 from datetime import datetime
 
+from instrumentation import instrumentation, logger
+from output_formats import FORMATS, OutputWriter, available_formats
+from pptx_export import PptxWriter, export_pptx
+from result_cache import ResultCache
+from batch_designer import design_slides
+from checkpoint_journal import CheckpointJournal, deck_key, job_key
+from knowledge_index import KnowledgeIndex
+from search_backend import HTTPSearchBackend, SearchBackend, enrich_research
+from slide_model import Deck, Slide
+from slide_planner import SlideSpec, infer_plan, plan_slides, required_fields, slide_dependencies
+from slide_store import SlideStore
+
 # Since we can't actually install crewai in this environment, 
 # we'll simulate the multi-agent approach with structured functions
 
+# Fixed slide text, shared by every generated deck
+TITLE_SLIDE_POINTS = (
+    "Research-Driven Insights and Recommendations",
+    "Comprehensive Market Analysis",
+    "Strategic Implementation Roadmap",
+    "Data-Backed Decision Framework"
+)
+
+CLOSING_SLIDE_POINTS = (
+    "Strategic Discussion Points",
+    "Implementation Planning Session",
+    "Resource Allocation Decisions",
+    "Timeline and Milestone Setting",
+    "Follow-up Actions and Responsibilities"
+)
+
+# Research agent output, one builder per field so a slide plan computes only what it reads
+RESEARCH_SECTIONS: Dict[str, Callable[[str, str], Any]] = {
+    "overview": lambda topic, requirements: f"Comprehensive analysis of {topic} reveals significant market dynamics and strategic opportunities",
+    "current_trends": lambda topic, requirements: [
+        f"Emerging trends in {topic} show rapid evolution and adoption",
+        f"Market leaders are investing heavily in {topic} development",
+        f"Consumer demand for {topic} solutions is accelerating",
+        f"Technology integration is driving {topic} innovation"
+    ],
+    "market_data": lambda topic, requirements: {
+        "size": f"The {topic} market represents substantial economic value",
+        "growth_rate": f"Year-over-year growth in {topic} exceeds industry averages",
+        "key_players": f"Major organizations leading {topic} implementation",
+        "regional_insights": f"Global adoption of {topic} varies by region and sector"
+    },
+    "challenges": lambda topic, requirements: [
+        f"Implementation barriers in {topic} require strategic planning",
+        f"Resource allocation for {topic} initiatives needs optimization",
+        f"Regulatory considerations affect {topic} deployment",
+        f"Skills gap in {topic} expertise impacts adoption rates"
+    ],
+    "opportunities": lambda topic, requirements: [
+        f"Untapped potential in {topic} creates competitive advantages",
+        f"Innovation in {topic} opens new market segments",
+        f"Strategic partnerships can accelerate {topic} success",
+        f"Investment in {topic} capabilities drives long-term value"
+    ],
+    "custom_focus": lambda topic, requirements: f"Specialized research focus on: {requirements}",
+    "requirement_analysis": lambda topic, requirements: [
+        f"Detailed analysis of {requirements} within {topic} context",
+        f"Strategic implications of {requirements} for {topic} implementation",
+        f"Best practices for {requirements} in {topic} scenarios"
+    ]
+}
+
+# Research fields that only exist when requirements are given
+REQUIREMENT_FIELDS = frozenset(("custom_focus", "requirement_analysis"))
+
+# Analyst agent output, one builder per field
+ANALYSIS_SECTIONS: Dict[str, Callable[[str], List[str]]] = {
+    "key_insights": lambda topic: [
+        f"Strategic positioning in {topic} requires comprehensive understanding of market dynamics",
+        f"Success in {topic} depends on balancing innovation with practical implementation",
+        f"Risk mitigation strategies are essential for {topic} initiatives",
+        f"Competitive advantage in {topic} comes from integrated approach to challenges and opportunities"
+    ],
+    "strategic_recommendations": lambda topic: [
+        f"Develop phased implementation strategy for {topic} adoption",
+        f"Invest in capability building and skills development for {topic}",
+        f"Establish partnerships to accelerate {topic} success",
+        f"Create measurement framework to track {topic} performance"
+    ],
+    "risk_assessment": lambda topic: [
+        f"Market volatility may impact {topic} investment returns",
+        f"Technology changes could affect {topic} solution relevance",
+        f"Competitive pressure requires agile {topic} strategy",
+        f"Regulatory changes may influence {topic} implementation"
+    ],
+    "success_factors": lambda topic: [
+        f"Leadership commitment drives {topic} transformation success",
+        f"Cross-functional collaboration enhances {topic} outcomes",
+        f"Continuous learning accelerates {topic} capability development",
+        f"Data-driven decision making optimizes {topic} performance"
+    ]
+}
+
+def research_fields_for(requirements: str) -> Tuple[str, ...]:
+    """Every research field available for the given requirements"""
+    return tuple(field for field in RESEARCH_SECTIONS if field not in REQUIREMENT_FIELDS or requirements)
+
 class MockAgent:
+    # Agents hold no per-request state; one set is built per search tool and shared
+    __slots__ = ("role", "goal", "backstory", "tools", "verbose")
+
     def __init__(self, role: str, goal: str, backstory: str, tools=None, verbose=True):
         self.role = role
         self.goal = goal
         self.backstory = backstory
-        self.tools = tools or []
+        self.tools = tuple(tools or ())
         self.verbose = verbose
 
 class MockTask:
-    def __init__(self, description: str, agent: MockAgent, context=None):
-        self.description = description
+    __slots__ = ("_description", "_params", "agent", "context", "action", "output")
+
+    def __init__(self, description: str, agent: MockAgent, context=None, action: Optional[Callable[..., Any]] = None,
+                 params: Optional[Dict[str, Any]] = None):
+        # With params, description is a str.format template rendered only when read
+        self._description = description
+        self._params = params
         self.agent = agent
         self.context = context or []
+        # Called with the outputs of the context tasks, in context order
+        self.action = action
+        self.output = None
+
+    @property
+    def description(self) -> str:
+        if self._params is not None:
+            self._description = self._description.format(**self._params)
+            self._params = None
+        return self._description
+
+    def execute(self):
+        """Run the task's action on the outputs of the tasks it depends on"""
+        if self.action is not None:
+            with instrumentation.span("task", agent=self.agent.role):
+                self.output = self.action(*[task.output for task in self.context])
+        return self.output
+
+# Worker threads for concurrently ready tasks, shared by every graph run in the process
+_task_pool: Optional[ThreadPoolExecutor] = None
+_task_pool_pid = 0
+_task_pool_lock = threading.Lock()
+
+def _shared_task_pool() -> ThreadPoolExecutor:
+    global _task_pool, _task_pool_pid
+    with _task_pool_lock:
+        # A pool inherited through fork has no threads behind it; worker processes build their own
+        if _task_pool is None or _task_pool_pid != os.getpid():
+            _task_pool = ThreadPoolExecutor(thread_name_prefix="crew-task")
+            _task_pool_pid = os.getpid()
+        return _task_pool
+
+def run_task_graph(context: Sequence[Sequence[int]], execute: Callable[[int], Any],
+                   tasks: Optional[Iterable[int]] = None, max_workers: Optional[int] = None) -> int:
+    """
+    Run tasks (by default all of them) so that each starts as soon as the tasks in its
+    context have finished; context entries outside tasks count as already done. Independent
+    ready tasks run concurrently on the shared pool, at most max_workers at a time; a lone
+    ready task runs on the calling thread. Returns the number of tasks run.
+    """
+    tasks = list(range(len(context))) if tasks is None else list(tasks)
+    selected = set(tasks)
+    pending = {i: sum(1 for dep in context[i] if dep in selected) for i in tasks}
+    dependents: Dict[int, List[int]] = {i: [] for i in tasks}
+    for i in tasks:
+        for dep in context[i]:
+            if dep in selected:
+                dependents[dep].append(i)
+
+    ready = [i for i in tasks if not pending[i]]
+    running: Dict[Future, int] = {}
+    completed = 0
+    try:
+        while ready or running:
+            if len(ready) == 1 and not running:
+                # A single runnable task gains nothing from a worker thread
+                i = ready.pop()
+                execute(i)
+                finished = [i]
+            else:
+                pool = _shared_task_pool()
+                while ready and (max_workers is None or len(running) < max_workers):
+                    i = ready.pop(0)
+                    running[pool.submit(execute, i)] = i
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    i = running.pop(future)
+                    future.result()
+                    finished.append(i)
+
+            for i in finished:
+                completed += 1
+                for dependent in dependents[i]:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+    finally:
+        if running:
+            # A task failed: drop what has not started and let the rest finish before raising
+            for future in running:
+                future.cancel()
+            wait(running)
+
+    if completed != len(tasks):
+        raise ValueError("Task graph contains a dependency cycle")
+    return completed
 
 class MockCrew:
-    def __init__(self, agents: List[MockAgent], tasks: List[MockTask], verbose=True):
+    def __init__(self, agents: List[MockAgent], tasks: List[MockTask], verbose=True, max_workers: Optional[int] = None):
         self.agents = agents
         self.tasks = tasks
         self.verbose = verbose
-    
+        self.max_workers = max_workers
+
     def kickoff(self):
-        # Simulate the crew execution
-        return "Presentation content generated successfully through multi-agent collaboration"
+        """
+        Execute the task graph defined by each task's context, running independent tasks
+        concurrently. Returns the output of the last task.
+        """
+        position = {task: i for i, task in enumerate(self.tasks)}
+        try:
+            context = [[position[dependency] for dependency in task.context] for task in self.tasks]
+        except KeyError:
+            raise ValueError("A task depends on a task outside the crew") from None
+        run_task_graph(context, lambda i: self.tasks[i].execute(), max_workers=self.max_workers)
+        return self.tasks[-1].output if self.tasks else None
 
-class PPTGeneratorCrew:
-    def __init__(self):
-        # Simulate search tool functionality
-        self.search_tool = self._mock_search_tool()
-        
-    def _mock_search_tool(self):
-        """Mock search functionality that returns relevant information"""
-        return "DuckDuckGoSearchRun"
-        
-    def create_agents(self):
+class TaskRequest:
+    """The per-request inputs a compiled task graph is bound to"""
+
+    __slots__ = ("topic", "requirements", "plan", "research_fields", "analysis_fields")
+
+    def __init__(self, topic: str, requirements: str, plan: Sequence[SlideSpec]):
+        self.topic = topic
+        self.requirements = requirements
+        self.plan = plan
+        # The slide plan decides which research and analysis fields the agents compute
+        self.research_fields, self.analysis_fields = required_fields(plan)
+
+class TaskTemplate:
+    """
+    One task of the compiled graph: which agent runs it, which tasks feed it and the crew
+    call it makes. description is a str.format template over topic and focus, where focus
+    is the requirements or default_focus when there are none.
+    """
+
+    __slots__ = ("name", "agent", "description", "default_focus", "context", "action")
+
+    def __init__(self, name: str, agent: str, description: str, action: Callable[..., Any],
+                 context: Sequence[str] = (), default_focus: str = ""):
+        self.name = name
+        self.agent = agent
+        self.description = description
+        self.default_focus = default_focus
+        self.context = tuple(context)
+        # Called as action(crew, request, *context outputs)
+        self.action = action
+
+    def params(self, request: TaskRequest) -> Dict[str, Any]:
+        return {"topic": request.topic, "focus": request.requirements or self.default_focus}
+
+class TaskGraph:
+    """
+    Task templates compiled once into an execution schedule. A graph holds no per-request
+    state: run() keeps task outputs local to the call, so one graph (and the crew using
+    it) can serve many threads at once.
+    """
+
+    __slots__ = ("templates", "_index", "_context", "_sinks")
+
+    def __init__(self, templates: Sequence[TaskTemplate]):
+        self.templates = tuple(templates)
+        self._index = {template.name: position for position, template in enumerate(self.templates)}
+        try:
+            self._context = tuple(tuple(self._index[name] for name in template.context) for template in self.templates)
+        except KeyError as exc:
+            raise ValueError(f"Task depends on unknown task {exc.args[0]!r}") from None
+
+        # Reject cycles at compile time rather than on the first run
+        done: set = set()
+        remaining = list(range(len(self.templates)))
+        while remaining:
+            ready = [i for i in remaining if all(dep in done for dep in self._context[i])]
+            if not ready:
+                raise ValueError("Task graph contains a dependency cycle")
+            done.update(ready)
+            remaining = [i for i in remaining if i not in done]
+        # Tasks no other task consumes: the outputs a full run produces
+        consumed = {dep for context in self._context for dep in context}
+        self._sinks = tuple(template.name for i, template in enumerate(self.templates) if i not in consumed)
+
+    def bind(self, crew: "PPTGeneratorCrew", request: TaskRequest) -> List[MockTask]:
+        """Materialize MockTasks for one request; their descriptions render on first read"""
+        agents = crew.agents_by_name
+        tasks: List[MockTask] = []
+        for template, context in zip(self.templates, self._context):
+            tasks.append(MockTask(
+                template.description, agents[template.agent], [tasks[i] for i in context],
+                functools.partial(template.action, crew, request), template.params(request)
+            ))
+        return tasks
+
+    def run(self, crew: "PPTGeneratorCrew", request: TaskRequest, until: Optional[str] = None,
+            max_workers: Optional[int] = None, completed: Optional[Dict[str, Any]] = None,
+            on_complete: Optional[Callable[[str, Any], None]] = None) -> List[Any]:
+        """
+        Execute the graph for one request, returning every task's output in template order.
+        until stops after the named task and the tasks it needs have run. completed maps
+        task names to outputs from an earlier run, which are reused instead of recomputed;
+        on_complete(name, output) is called as each remaining task finishes.
+        """
+        needed = self._needed([until]) if until is not None else None
+        outputs: List[Any] = [None] * len(self.templates)
+        agents = crew.agents_by_name
+        if completed:
+            needed = self._needed([until] if until is not None else self._sinks, completed)
+            for name, output in completed.items():
+                if name in self._index:
+                    outputs[self._index[name]] = output
+
+        def execute(i: int):
+            template = self.templates[i]
+            with instrumentation.span("task", agent=agents[template.agent].role):
+                outputs[i] = template.action(crew, request, *[outputs[dep] for dep in self._context[i]])
+            if on_complete is not None:
+                on_complete(template.name, outputs[i])
+
+        # Each task starts as soon as its own context is done, so independent branches overlap
+        run_task_graph(self._context, execute, sorted(needed) if needed is not None else None, max_workers)
+        return outputs
+
+    def output(self, outputs: Sequence[Any], name: str) -> Any:
+        """The named task's output from the list run() returned"""
+        return outputs[self._index[name]]
+
+    def _needed(self, names: Iterable[str], completed: Container[str] = ()) -> frozenset:
+        """The named tasks and everything they depend on, stopping at tasks already completed"""
+        stack = [self._index[name] for name in names]
+        needed = set()
+        while stack:
+            i = stack.pop()
+            if i not in needed and self.templates[i].name not in completed:
+                needed.add(i)
+                stack.extend(self._context[i])
+        return frozenset(needed)
+
+def _build_agents(search_tool: Any) -> Dict[str, MockAgent]:
+    return {
         # Research Agent
-        researcher = MockAgent(
+        "researcher": MockAgent(
             role='Research Specialist',
             goal='Find accurate and relevant information about the given topic',
             backstory='Expert at finding and gathering information from various sources',
-            tools=[self.search_tool],
+            tools=[search_tool],
             verbose=True
-        )
+        ),
 
         # Content Organizer Agent
-        organizer = MockAgent(
+        "organizer": MockAgent(
             role='Content Organizer',
             goal='Structure and organize the gathered information into a coherent presentation format',
             backstory="""You are a skilled content organizer with expertise in creating 
             engaging and well-structured presentations. You know how to transform raw 
             information into compelling content that tells a story.""",
             verbose=True
-        )
+        ),
 
         # PPT Designer Agent
-        designer = MockAgent(
+        "designer": MockAgent(
             role='PPT Designer',
             goal='Create a professional and visually appealing PowerPoint presentation',
             backstory="""You are a PowerPoint expert with years of experience in creating 
             stunning presentations. You know how to balance text, visuals, and layout to 
             create impactful slides.""",
             verbose=True
-        )
+        ),
 
         # Content Analyst Agent
-        analyst = MockAgent(
+        "analyst": MockAgent(
             role='Content Analyst',
             goal='Analyze and synthesize information into meaningful insights',
             backstory='Expert at analyzing information and providing valuable insights',
             verbose=True
         )
+    }
 
-        return researcher, organizer, designer, analyst
+DEFAULT_SEARCH_TOOL = "DuckDuckGoSearchRun"
 
-    def create_tasks(self, topic: str, requirements: str, researcher: MockAgent, organizer: MockAgent, designer: MockAgent, analyst: MockAgent):
-        # Research Task
-        research_task = MockTask(
-            description=f'Research and gather comprehensive information about: {topic}. Focus areas: {requirements if requirements else "general overview, trends, challenges, opportunities"}',
-            agent=researcher
-        )
+# Agents for crews without a search backend, shared by every such crew in the process
+DEFAULT_AGENTS = _build_agents(DEFAULT_SEARCH_TOOL)
 
-        # Analysis Task
-        analysis_task = MockTask(
-            description=f'Analyze the research findings about: {topic} and extract key insights, trends, and strategic implications',
-            agent=analyst,
-            context=[research_task]
-        )
+# The presentation workflow: research -> analysis -> organizer -> designer
+PRESENTATION_GRAPH = TaskGraph([
+    # Research Task
+    TaskTemplate(
+        "research", "researcher",
+        'Research and gather comprehensive information about: {topic}. Focus areas: {focus}',
+        lambda crew, request: crew._execute_research_agent(request.topic, request.requirements,
+                                                           request.research_fields),
+        default_focus="general overview, trends, challenges, opportunities"
+    ),
+
+    # Analysis Task
+    TaskTemplate(
+        "analysis", "analyst",
+        'Analyze the research findings about: {topic} and extract key insights, trends, and strategic implications',
+        lambda crew, request, research_data: crew._execute_analyst_agent(
+            research_data, request.topic, request.requirements, request.analysis_fields),
+        context=("research",)
+    ),
 
-        # Organization Task
-        organize_task = MockTask(
-            description=f"""Using the research and analysis:
+    # Organization Task
+    TaskTemplate(
+        "organize", "organizer",
+        """Using the research and analysis:
             - Create a logical presentation structure for {topic}
             - Organize information into clear, engaging slides
             - Develop compelling titles and bullet points
             - Ensure content flows naturally from introduction to conclusion
-            - Focus on: {requirements if requirements else "comprehensive coverage"}
+            - Focus on: {focus}
             Output: Structured slide content with titles, subtitles, and bullet points.""",
-            agent=organizer,
-            context=[research_task, analysis_task]
-        )
+        lambda crew, request, research_data, analysis_data: crew._execute_organizer_agent(
+            research_data, analysis_data, request.topic, request.requirements, request.plan),
+        context=("research", "analysis"),
+        default_focus="comprehensive coverage"
+    ),
 
-        # Design Task
-        design_task = MockTask(
-            description=f"""Using the organized content:
+    # Design Task
+    TaskTemplate(
+        "design", "designer",
+        """Using the organized content:
             - Finalize slide layouts and visual elements
             - Ensure professional presentation standards
             - Optimize content for visual impact and readability
             - Create cohesive design across all slides
             Output: Final presentation with proper formatting and layout specifications.""",
-            agent=designer,
-            context=[organize_task]
-        )
+        lambda crew, request, slides: crew._execute_designer_agent(slides, request.topic),
+        context=("organize",)
+    ),
+])
 
-        return [research_task, analysis_task, organize_task, design_task]
+# Default for regenerate_deck's num_slides, where None already means the standard deck
+_UNCHANGED = object()
 
-    def _execute_research_agent(self, topic: str, requirements: str) -> Dict[str, Any]:
-        """Simulate research agent performing comprehensive research"""
-        print(f"🔍 Research Agent: Conducting deep research on '{topic}'...")
-        
-        # Simulate comprehensive research based on topic
-        research_findings = {
-            "overview": f"Comprehensive analysis of {topic} reveals significant market dynamics and strategic opportunities",
-            "current_trends": [
-                f"Emerging trends in {topic} show rapid evolution and adoption",
-                f"Market leaders are investing heavily in {topic} development",
-                f"Consumer demand for {topic} solutions is accelerating",
-                f"Technology integration is driving {topic} innovation"
-            ],
-            "market_data": {
-                "size": f"The {topic} market represents substantial economic value",
-                "growth_rate": f"Year-over-year growth in {topic} exceeds industry averages",
-                "key_players": f"Major organizations leading {topic} implementation",
-                "regional_insights": f"Global adoption of {topic} varies by region and sector"
-            },
-            "challenges": [
-                f"Implementation barriers in {topic} require strategic planning",
-                f"Resource allocation for {topic} initiatives needs optimization",
-                f"Regulatory considerations affect {topic} deployment",
-                f"Skills gap in {topic} expertise impacts adoption rates"
-            ],
-            "opportunities": [
-                f"Untapped potential in {topic} creates competitive advantages",
-                f"Innovation in {topic} opens new market segments",
-                f"Strategic partnerships can accelerate {topic} success",
-                f"Investment in {topic} capabilities drives long-term value"
-            ]
-        }
+class PPTGeneratorCrew:
+    def __init__(self, verbose: bool = True, cache: Optional[ResultCache] = None,
+                 search_backend: Optional[SearchBackend] = None):
+        # Research queries go to the search backend when one is configured; otherwise
+        # the research agent falls back to templated findings
+        self.search_backend = search_backend
+        self.search_tool = search_backend if search_backend is not None else self._mock_search_tool()
+        self.agents_by_name = DEFAULT_AGENTS if search_backend is None else _build_agents(search_backend)
+        self.verbose = verbose
+        # Progress messages go to the "crew_ai" logger; a quiet crew logs them at DEBUG
+        self._log_level = logging.INFO if verbose else logging.DEBUG
+        # Optional cache for research and analysis outputs, keyed on (topic, requirements)
+        # and, for research, the search backend's identity
+        self.cache = cache
+
+    def _log(self, message: str, *args: Any):
+        """Log a progress message; formatting is skipped when the level is disabled"""
+        logger.log(self._log_level, message, *args)
         
-        if requirements:
-            research_findings["custom_focus"] = f"Specialized research focus on: {requirements}"
-            research_findings["requirement_analysis"] = [
-                f"Detailed analysis of {requirements} within {topic} context",
-                f"Strategic implications of {requirements} for {topic} implementation",
-                f"Best practices for {requirements} in {topic} scenarios"
-            ]
+    def _mock_search_tool(self):
+        """Mock search functionality that returns relevant information"""
+        return DEFAULT_SEARCH_TOOL
         
-        return research_findings
+    def create_agents(self):
+        """The crew's agents as (researcher, organizer, designer, analyst); built once, not per call"""
+        agents = self.agents_by_name
+        return agents["researcher"], agents["organizer"], agents["designer"], agents["analyst"]
 
-    def _execute_analyst_agent(self, research_data: Dict[str, Any], topic: str) -> Dict[str, Any]:
-        """Simulate analyst agent processing research into insights"""
-        print(f"📊 Content Analyst: Analyzing research data for strategic insights...")
-        
-        analysis_results = {
-            "key_insights": [
-                f"Strategic positioning in {topic} requires comprehensive understanding of market dynamics",
-                f"Success in {topic} depends on balancing innovation with practical implementation",
-                f"Risk mitigation strategies are essential for {topic} initiatives",
-                f"Competitive advantage in {topic} comes from integrated approach to challenges and opportunities"
-            ],
-            "strategic_recommendations": [
-                f"Develop phased implementation strategy for {topic} adoption",
-                f"Invest in capability building and skills development for {topic}",
-                f"Establish partnerships to accelerate {topic} success",
-                f"Create measurement framework to track {topic} performance"
-            ],
-            "risk_assessment": [
-                f"Market volatility may impact {topic} investment returns",
-                f"Technology changes could affect {topic} solution relevance",
-                f"Competitive pressure requires agile {topic} strategy",
-                f"Regulatory changes may influence {topic} implementation"
-            ],
-            "success_factors": [
-                f"Leadership commitment drives {topic} transformation success",
-                f"Cross-functional collaboration enhances {topic} outcomes",
-                f"Continuous learning accelerates {topic} capability development",
-                f"Data-driven decision making optimizes {topic} performance"
-            ]
+    def create_tasks(self, topic: str, requirements: str, researcher: MockAgent = None, organizer: MockAgent = None,
+                     designer: MockAgent = None, analyst: MockAgent = None,
+                     plan: Optional[Sequence[SlideSpec]] = None) -> List[MockTask]:
+        """
+        Bind the compiled task graph to one request as MockTasks (research, analysis,
+        organize, design), ready for MockCrew(...).kickoff(). The tasks always run on the
+        crew's own agents; the agent parameters are accepted for compatibility and ignored.
+        """
+        if plan is None:
+            plan = plan_slides(None, requirements)
+        return PRESENTATION_GRAPH.bind(self, TaskRequest(topic, requirements, plan))
+
+    def _cached(self, stage: str, topic: str, requirements: str, fields: Sequence[str],
+                compute: Callable[[Sequence[str]], Dict[str, Any]], source: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compute the requested output fields of a stage, serving them from the cache when one
+        is configured. Cached entries accumulate fields, so a later, larger plan only computes
+        what is still missing. source is the identity of the stage's search backend, if any.
+        """
+        if not fields:
+            return {}
+        if self.cache is None:
+            return compute(fields)
+        key = ResultCache.make_key(stage, topic, requirements, source)
+        entry = self.cache.get(key) or {}
+        missing = [field for field in fields if field not in entry]
+        if missing:
+            computed = compute(missing)
+            # Merging keeps the entry's creation time, so older fields still expire on schedule
+            self.cache.update(key, computed)
+            entry.update(computed)
+        return entry
+
+    def _execute_research_agent(self, topic: str, requirements: str, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Simulate research agent performing comprehensive research"""
+        self._log("🔍 Research Agent: Conducting deep research on '%s'...", topic)
+        if fields is None:
+            fields = research_fields_for(requirements)
+        with instrumentation.span("agent.research"):
+            source = self.search_backend.identity if self.search_backend is not None else None
+            return self._cached("research", topic, requirements, fields,
+                                lambda missing: self._research_findings(topic, requirements, missing), source)
+
+    def _research_findings(self, topic: str, requirements: str, fields: Sequence[str]) -> Dict[str, Any]:
+        # Simulate comprehensive research based on topic, one section per requested field
+        findings = {
+            field: RESEARCH_SECTIONS[field](topic, requirements)
+            for field in fields
+            if field not in REQUIREMENT_FIELDS or requirements
         }
-        
-        return analysis_results
+        if self.search_backend is not None:
+            findings = enrich_research(self.search_backend, topic, requirements, findings)
+        return findings
 
-    def _execute_organizer_agent(self, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> List[Dict[str, Any]]:
+    def _execute_analyst_agent(self, research_data: Dict[str, Any], topic: str, requirements: str = "",
+                               fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Simulate analyst agent processing research into insights"""
+        self._log("📊 Content Analyst: Analyzing research data for strategic insights...")
+        if fields is None:
+            fields = tuple(ANALYSIS_SECTIONS)
+        with instrumentation.span("agent.analyst"):
+            return self._cached("analysis", topic, requirements, fields,
+                                lambda missing: self._analysis_results(research_data, topic, missing))
+
+    def _analysis_results(self, research_data: Dict[str, Any], topic: str, fields: Sequence[str]) -> Dict[str, Any]:
+        return {field: ANALYSIS_SECTIONS[field](topic) for field in fields}
+
+    def _execute_organizer_agent(self, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str,
+                                 plan: Optional[Sequence[SlideSpec]] = None) -> List[Slide]:
         """Simulate organizer agent creating structured presentation content"""
-        print(f"📋 Content Organizer: Structuring comprehensive presentation content...")
-        
-        slides = []
-        
-        # Title Slide - Agent Generated
-        slides.append({
-            "id": 0,
-            "title": f"{topic}",
-            "subtitle": "Strategic Analysis & Implementation Framework",
-            "content": [
-                "Research-Driven Insights and Recommendations",
-                "Comprehensive Market Analysis",
-                "Strategic Implementation Roadmap",
-                "Data-Backed Decision Framework"
-            ],
-            "slideType": "title",
-            "layout": "title",
-            "images": [],
-            "agent_source": "Content Organizer - Presentation Structure"
-        })
-        
-        # Executive Summary - Agent Generated
-        slides.append({
-            "id": 1,
-            "title": "Executive Summary",
-            "content": [
+        self._log("📋 Content Organizer: Structuring comprehensive presentation content...")
+        with instrumentation.span("agent.organizer"):
+            return list(self._iter_organizer_slides(research_data, analysis_data, topic, requirements, plan))
+
+    def _iter_organizer_slides(self, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str,
+                               plan: Optional[Sequence[SlideSpec]] = None) -> Iterator[Slide]:
+        """Yield the planned slides one at a time, in presentation order; ids follow slide position"""
+        if plan is None:
+            plan = plan_slides(None, requirements)
+        for slide_id, spec in enumerate(plan):
+            yield getattr(self, spec.builder)(slide_id, research_data, analysis_data, topic, requirements)
+
+    def _slide_title(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Title Slide - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title=f"{topic}",
+            subtitle="Strategic Analysis & Implementation Framework",
+            content=TITLE_SLIDE_POINTS,
+            slideType="title",
+            layout="title",
+            agent_source="Content Organizer - Presentation Structure"
+        )
+
+    def _slide_executive_summary(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Executive Summary - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Executive Summary",
+            content=[
                 research_data.get("overview", f"Strategic overview of {topic} landscape"),
                 "Key findings from comprehensive research and analysis",
                 "Critical success factors and implementation considerations",
                 "Recommended actions based on market intelligence",
                 "Expected outcomes and value creation opportunities"
             ],
-            "slideType": "content",
-            "layout": "content",
-            "images": [],
-            "agent_source": "Research Specialist & Content Analyst Synthesis"
-        })
-        
-        # Market Research & Trends - Agent Generated
-        slides.append({
-            "id": 2,
-            "title": "Market Research & Current Trends",
-            "content": research_data.get("current_trends", [
+            slideType="content",
+            layout="content",
+            agent_source="Research Specialist & Content Analyst Synthesis"
+        )
+
+    def _slide_market_trends(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Market Research & Trends - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Market Research & Current Trends",
+            content=research_data.get("current_trends", [
                 f"Market dynamics in {topic} show significant evolution",
                 f"Industry leaders are prioritizing {topic} initiatives",
                 f"Consumer behavior trends support {topic} adoption",
                 f"Technology convergence is reshaping {topic} landscape"
             ]),
-            "slideType": "content",
-            "layout": "content_with_image",
-            "images": [],
-            "agent_source": "Research Specialist - Market Intelligence"
-        })
-        
-        # Strategic Insights - Agent Generated
-        slides.append({
-            "id": 3,
-            "title": "Strategic Insights & Analysis",
-            "content": analysis_data.get("key_insights", [
+            slideType="content",
+            layout="content_with_image",
+            agent_source="Research Specialist - Market Intelligence"
+        )
+
+    def _slide_strategic_insights(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Strategic Insights - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Strategic Insights & Analysis",
+            content=analysis_data.get("key_insights", [
                 f"Deep analysis reveals critical {topic} success patterns",
                 f"Strategic positioning requires understanding of market forces",
                 f"Competitive advantage emerges from integrated approach",
                 f"Long-term value creation depends on systematic implementation"
             ]),
-            "slideType": "content",
-            "layout": "content",
-            "images": [],
-            "agent_source": "Content Analyst - Strategic Intelligence"
-        })
-        
-        # Opportunities & Challenges - Agent Generated
-        slides.append({
-            "id": 4,
-            "title": "Opportunities & Challenges Analysis",
-            "content": [
+            slideType="content",
+            layout="content",
+            agent_source="Content Analyst - Strategic Intelligence"
+        )
+
+    def _slide_opportunities_challenges(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Opportunities & Challenges - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Opportunities & Challenges Analysis",
+            content=[
                 "Opportunities:",
                 *research_data.get("opportunities", [f"Strategic opportunities in {topic} market"]),
                 "Key Challenges:",
                 *research_data.get("challenges", [f"Implementation challenges for {topic}"])[:2]
             ],
-            "slideType": "content",
-            "layout": "content_with_image",
-            "images": [],
-            "agent_source": "Research Specialist - Opportunity Assessment"
-        })
-        
-        # Strategic Recommendations - Agent Generated
-        slides.append({
-            "id": 5,
-            "title": "Strategic Recommendations",
-            "content": analysis_data.get("strategic_recommendations", [
+            slideType="content",
+            layout="content_with_image",
+            agent_source="Research Specialist - Opportunity Assessment"
+        )
+
+    def _slide_recommendations(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Strategic Recommendations - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Strategic Recommendations",
+            content=analysis_data.get("strategic_recommendations", [
                 f"Develop comprehensive {topic} strategy framework",
                 f"Implement phased approach to {topic} adoption",
                 f"Build organizational capabilities for {topic} success",
                 f"Establish metrics and monitoring for {topic} performance"
             ]),
-            "slideType": "content",
-            "layout": "content",
-            "images": [],
-            "agent_source": "Content Analyst - Strategic Planning"
-        })
-        
-        # Implementation Framework - Agent Generated
-        slides.append({
-            "id": 6,
-            "title": "Implementation Framework",
-            "content": [
+            slideType="content",
+            layout="content",
+            agent_source="Content Analyst - Strategic Planning"
+        )
+
+    def _slide_implementation(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Implementation Framework - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Implementation Framework",
+            content=[
                 f"Phase 1: Foundation & Strategy Development for {topic} (0-3 months)",
                 f"Phase 2: Pilot Implementation & Testing of {topic} solutions (3-6 months)",
                 f"Phase 3: Scaled Deployment & Optimization (6-12 months)",
                 f"Phase 4: Continuous Improvement & Innovation (12+ months)",
                 "Success metrics and performance monitoring throughout all phases"
             ],
-            "slideType": "content",
-            "layout": "content",
-            "images": [],
-            "agent_source": "Content Organizer - Implementation Planning"
-        })
-        
-        # Risk Management - Agent Generated
-        slides.append({
-            "id": 7,
-            "title": "Risk Management & Mitigation",
-            "content": analysis_data.get("risk_assessment", [
+            slideType="content",
+            layout="content",
+            agent_source="Content Organizer - Implementation Planning"
+        )
+
+    def _slide_risk_management(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Risk Management - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Risk Management & Mitigation",
+            content=analysis_data.get("risk_assessment", [
                 f"Identified risks in {topic} implementation require proactive management",
                 f"Mitigation strategies should address both internal and external factors",
                 f"Continuous monitoring enables early risk detection and response",
                 f"Contingency planning ensures {topic} initiative resilience"
             ]),
-            "slideType": "content",
-            "layout": "content_with_image",
-            "images": [],
-            "agent_source": "Content Analyst - Risk Assessment"
-        })
-        
-        # Success Factors - Agent Generated
-        slides.append({
-            "id": 8,
-            "title": "Critical Success Factors",
-            "content": analysis_data.get("success_factors", [
+            slideType="content",
+            layout="content_with_image",
+            agent_source="Content Analyst - Risk Assessment"
+        )
+
+    def _slide_success_factors(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Success Factors - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Critical Success Factors",
+            content=analysis_data.get("success_factors", [
                 f"Leadership commitment drives {topic} transformation",
                 f"Organizational alignment ensures {topic} adoption",
                 f"Continuous learning accelerates {topic} capability",
                 f"Performance measurement validates {topic} impact"
             ]),
-            "slideType": "content",
-            "layout": "content",
-            "images": [],
-            "agent_source": "Content Analyst - Success Framework"
-        })
-        
-        # Custom Requirements Slide (if provided) - Agent Generated
-        if requirements and requirements.strip():
-            slides.append({
-                "id": 9,
-                "title": f"Custom Analysis: {requirements[:50]}...",
-                "content": research_data.get("requirement_analysis", [
-                    f"Specialized focus on {requirements} within {topic} context",
-                    f"Strategic implications of {requirements} for organizational success",
-                    f"Implementation considerations specific to {requirements}",
-                    f"Success metrics tailored to {requirements} objectives",
-                    f"Resource requirements and timeline for {requirements} delivery"
-                ]),
-                "slideType": "content",
-                "layout": "content_with_image",
-                "images": [],
-                "agent_source": "Research Specialist - Custom Requirements Analysis"
-            })
-        
-        # Closing Slide - Agent Generated
-        slides.append({
-            "id": len(slides),
-            "title": "Next Steps & Discussion",
-            "subtitle": "Questions & Strategic Planning",
-            "content": [
-                "Strategic Discussion Points",
-                "Implementation Planning Session",
-                "Resource Allocation Decisions",
-                "Timeline and Milestone Setting",
-                "Follow-up Actions and Responsibilities"
+            slideType="content",
+            layout="content",
+            agent_source="Content Analyst - Success Framework"
+        )
+
+    def _slide_custom_requirements(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Custom Requirements Slide (only planned when requirements are given) - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title=f"Custom Analysis: {requirements[:50]}...",
+            content=research_data.get("requirement_analysis", [
+                f"Specialized focus on {requirements} within {topic} context",
+                f"Strategic implications of {requirements} for organizational success",
+                f"Implementation considerations specific to {requirements}",
+                f"Success metrics tailored to {requirements} objectives",
+                f"Resource requirements and timeline for {requirements} delivery"
+            ]),
+            slideType="content",
+            layout="content_with_image",
+            agent_source="Research Specialist - Custom Requirements Analysis"
+        )
+
+    def _slide_market_landscape(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Market Landscape (expansion for large budgets) - Agent Generated"""
+        market_data = research_data.get("market_data", {})
+        return Slide(
+            id=slide_id,
+            title="Market Landscape",
+            content=[
+                market_data.get("size", f"Market size and value of {topic}"),
+                market_data.get("growth_rate", f"Growth outlook for {topic}"),
+                market_data.get("key_players", f"Leading organizations in {topic}"),
+                market_data.get("regional_insights", f"Regional adoption of {topic}")
             ],
-            "slideType": "closing",
-            "layout": "title",
-            "images": [],
-            "agent_source": "PPT Designer - Presentation Conclusion"
-        })
-        
-        return slides
+            slideType="content",
+            layout="content_with_image",
+            agent_source="Research Specialist - Market Data"
+        )
 
-    def _execute_designer_agent(self, slides: List[Dict[str, Any]], topic: str) -> List[Dict[str, Any]]:
+    def _slide_key_challenges(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Implementation Challenges (expansion for large budgets) - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Implementation Challenges",
+            content=research_data.get("challenges", [f"Implementation challenges for {topic}"]),
+            slideType="content",
+            layout="content",
+            agent_source="Research Specialist - Challenge Assessment"
+        )
+
+    def _slide_closing(self, slide_id: int, research_data: Dict[str, Any], analysis_data: Dict[str, Any], topic: str, requirements: str) -> Slide:
+        """Closing Slide - Agent Generated"""
+        return Slide(
+            id=slide_id,
+            title="Next Steps & Discussion",
+            subtitle="Questions & Strategic Planning",
+            content=CLOSING_SLIDE_POINTS,
+            slideType="closing",
+            layout="title",
+            agent_source="PPT Designer - Presentation Conclusion"
+        )
+
+    def _execute_designer_agent(self, slides: List[Slide], topic: str) -> List[Slide]:
         """Simulate designer agent finalizing presentation design"""
-        print(f"🎨 PPT Designer: Finalizing professional presentation design...")
+        self._log("🎨 PPT Designer: Finalizing professional presentation design...")
         
-        # Designer agent optimizes content and adds design elements
-        for slide in slides:
-            # Add design enhancements
-            slide["design_notes"] = f"Professional layout optimized for {slide['slideType']} content"
-            slide["visual_elements"] = "Corporate template with consistent branding"
-            
-            # Optimize content length for readability
-            if len(slide.get("content", [])) > 6:
-                slide["content"] = slide["content"][:6]  # Limit to 6 points for better design
+        # Designer agent adds design elements and fits content to each slide's layout
+        with instrumentation.span("agent.designer"):
+            design_slides([slides])
         
         return slides
 
-    def generate_presentation(self, topic: str, requirements: str = "", num_slides: int = 10) -> List[Dict[str, Any]]:
-        """Main method to generate presentation using CrewAI multi-agent approach"""
-        
-        print(f"🚀 Initializing CrewAI Multi-Agent Presentation Generation")
-        print(f"📝 Topic: {topic}")
-        print(f"📋 Requirements: {requirements or 'General comprehensive analysis'}")
-        print("-" * 60)
-        
-        # Create agents
-        researcher, organizer, designer, analyst = self.create_agents()
-        
-        # Create tasks
-        tasks = self.create_tasks(topic, requirements, researcher, organizer, designer, analyst)
-        
-        # Create and simulate running the crew
-        crew = MockCrew(
-            agents=[researcher, organizer, designer, analyst],
-            tasks=tasks,
-            verbose=True
-        )
-        
-        # Execute the multi-agent workflow
-        print(f"🔄 Starting CrewAI Workflow Execution...")
-        
-        # Step 1: Research Agent
-        research_data = self._execute_research_agent(topic, requirements)
-        
-        # Step 2: Analyst Agent
-        analysis_data = self._execute_analyst_agent(research_data, topic)
+    def _design_slide(self, slide: Slide) -> Slide:
+        """Apply the designer pass to a single slide"""
+        design_slides([[slide]])
+        return slide
+
+    def generate_presentation(self, topic: str, requirements: str = "", num_slides: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Main method to generate presentation using CrewAI multi-agent approach.
+        num_slides sets the slide budget; None gives the standard deck.
+        """
+        return self.generate_deck(topic, requirements, num_slides).to_list()
+
+    def generate_deck(self, topic: str, requirements: str = "", num_slides: Optional[int] = None,
+                      completed: Optional[Dict[str, Any]] = None,
+                      on_complete: Optional[Callable[[str, Any], None]] = None) -> Deck:
+        """
+        Generate a presentation as a compact Deck of Slide objects. completed holds stage
+        outputs checkpointed by an earlier, interrupted run, which are not recomputed;
+        on_complete(stage, output) is called as each remaining stage finishes.
+        """
         
-        # Step 3: Organizer Agent
-        slides = self._execute_organizer_agent(research_data, analysis_data, topic, requirements)
+        self._log("🚀 Initializing CrewAI Multi-Agent Presentation Generation")
+        self._log("📝 Topic: %s", topic)
+        self._log("📋 Requirements: %s", requirements or 'General comprehensive analysis')
+        self._log("-" * 60)
         
-        # Step 4: Designer Agent
-        final_slides = self._execute_designer_agent(slides, topic)
+        # Plan the slides for the budget; the tasks only compute what the plan needs
+        plan = plan_slides(num_slides, requirements)
         
-        # Simulate crew execution result
-        crew_result = crew.kickoff()
+        # Execute the multi-agent workflow on the shared, precompiled task graph
+        self._log("🔄 Starting CrewAI Workflow Execution...")
+        with instrumentation.span("pipeline"):
+            slides = PRESENTATION_GRAPH.run(self, TaskRequest(topic, requirements, plan),
+                                            completed=completed, on_complete=on_complete)[-1]
+            final_slides = Deck(topic, requirements, slides, plan=[spec.key for spec in plan], num_slides=num_slides)
+        instrumentation.count("decks_generated")
         
-        print(f"✅ CrewAI Workflow Complete!")
-        print(f"🤝 Crew Result: {crew_result}")
-        print(f"📊 Generated {len(final_slides)} professional slides")
-        print(f"👥 Content created by: Research Specialist, Content Analyst, Content Organizer, PPT Designer")
+        self._log("✅ CrewAI Workflow Complete!")
+        self._log("🤝 Crew Result: Presentation content generated successfully through multi-agent collaboration")
+        self._log("📊 Generated %d professional slides", len(final_slides))
+        self._log("👥 Content created by: Research Specialist, Content Analyst, Content Organizer, PPT Designer")
         
         return final_slides
 
-def generate_presentation_content(topic: str, requirements: str = "", num_slides: int = 10) -> List[Dict[str, Any]]:
+    def generate_decks(self, requests: Sequence[Tuple[str, str, Optional[int]]],
+                       completed: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+                       on_complete: Optional[Sequence[Optional[Callable[[str, Any], None]]]] = None) -> List[Deck]:
+        """
+        Generate a deck per (topic, requirements, num_slides) request, running the designer
+        once over all of them. completed and on_complete hold each request's checkpointed
+        stages and stage hook, as for generate_deck.
+        """
+        completed = completed or [None] * len(requests)
+        on_complete = on_complete or [None] * len(requests)
+        plans = [plan_slides(num_slides, requirements) for _, requirements, num_slides in requests]
+        slide_lists: List[List[Slide]] = []
+        designing: List[int] = []
+        with instrumentation.span("pipeline.batch", decks=len(requests)):
+            for i, ((topic, requirements, _), plan, done) in enumerate(zip(requests, plans, completed)):
+                if done and "design" in done:
+                    slide_lists.append(done["design"])
+                    continue
+                outputs = PRESENTATION_GRAPH.run(self, TaskRequest(topic, requirements, plan), until="organize",
+                                                 completed=done, on_complete=on_complete[i])
+                slide_lists.append(PRESENTATION_GRAPH.output(outputs, "organize"))
+                designing.append(i)
+
+            with instrumentation.span("agent.designer", decks=len(designing)):
+                design_slides([slide_lists[i] for i in designing])
+            for i in designing:
+                if on_complete[i] is not None:
+                    on_complete[i]("design", slide_lists[i])
+        instrumentation.count("decks_generated", len(requests))
+        self._log("🎨 PPT Designer: Finalized %d decks in one pass", len(designing))
+        return [Deck(topic, requirements, slides, plan=[spec.key for spec in plan], num_slides=num_slides)
+                for (topic, requirements, num_slides), plan, slides in zip(requests, plans, slide_lists)]
+
+    def generate_batch(self, requests: Sequence[Tuple[str, str, Optional[int]]],
+                       completed: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+                       on_complete: Optional[Sequence[Optional[Callable[[str, Any], None]]]] = None,
+                       as_decks: bool = False) -> List[Dict[str, Any]]:
+        """
+        generate_decks for a batch that must not fail as a whole, returning a record per
+        request with topic, requirements, slides (a Deck with as_decks, else a list of
+        dicts) and error. If the batch fails it is redone deck by deck from the stages
+        already completed, so only failing decks get an error and no stage is reported twice.
+        """
+        completed = completed or [None] * len(requests)
+        on_complete = on_complete or [None] * len(requests)
+        progress = [dict(done or {}) for done in completed]
+
+        def track(done: Dict[str, Any], hook: Optional[Callable[[str, Any], None]]) -> Callable[[str, Any], None]:
+            def record(stage: str, output: Any):
+                if hook is not None:
+                    hook(stage, output)
+                done[stage] = output
+            return record
+
+        hooks = [track(done, hook) for done, hook in zip(progress, on_complete)]
+        results: List[Tuple[Optional[Deck], Optional[str]]] = []
+        try:
+            results = [(deck, None) for deck in self.generate_decks(requests, completed, hooks)]
+        except Exception:
+            results = []
+            for (topic, requirements, num_slides), done, hook in zip(requests, progress, hooks):
+                try:
+                    results.append((self.generate_deck(topic, requirements, num_slides, dict(done), hook), None))
+                except Exception as exc:
+                    results.append((None, f"{type(exc).__name__}: {exc}"))
+        return [{"topic": topic, "requirements": requirements,
+                 "slides": None if deck is None else deck if as_decks else deck.to_list(), "error": error}
+                for (topic, requirements, _), (deck, error) in zip(requests, results)]
+
+    def regenerate_deck(self, previous: Deck, topic: Optional[str] = None, requirements: Optional[str] = None,
+                        num_slides: Any = _UNCHANGED) -> Tuple[Deck, Dict[str, Any]]:
+        """
+        Rebuild a deck after its inputs changed, recomputing only the slides that depend on
+        a changed input (or are new to the plan) and reusing every other slide of previous
+        as-is, including any edits made to it. topic and requirements default to the
+        previous values and num_slides to the previous budget.
+
+        Returns the new deck and a diff of slide ids: changed, added and unchanged refer to
+        the new deck, removed to the previous one, and moved lists reused slides whose
+        position changed.
+        """
+        topic = previous.topic if topic is None else topic
+        requirements = previous.requirements if requirements is None else requirements
+        if num_slides is _UNCHANGED:
+            num_slides = previous.num_slides
+        changed_inputs = {name for name, old, new in (("topic", previous.topic, topic),
+                                                      ("requirements", previous.requirements, requirements))
+                          if old != new}
+
+        # Decks stored without their plan fall back to the organizer's agent_source labels;
+        # if those do not identify every slide, nothing can be reused
+        previous_plan = previous.plan
+        if previous_plan is None or len(previous_plan) != len(previous.slides):
+            previous_plan = infer_plan([slide.agent_source for slide in previous.slides])
+        previous_index = {key: index for index, key in enumerate(previous_plan or ())}
+
+        plan = plan_slides(num_slides, requirements)
+        rebuild = [spec for spec in plan
+                   if spec.key not in previous_index or slide_dependencies(spec) & changed_inputs]
+        self._log("♻️ Regenerating %d of %d slides for '%s'", len(rebuild), len(plan), topic)
+
+        with instrumentation.span("pipeline.regenerate", rebuilt=len(rebuild)):
+            research_fields, analysis_fields = required_fields(rebuild)
+            research_data = self._execute_research_agent(topic, requirements, research_fields)
+            analysis_data = self._execute_analyst_agent(research_data, topic, requirements, analysis_fields)
+            rebuilt = {spec.key for spec in rebuild}
+
+            diff: Dict[str, Any] = {"changed": [], "added": [], "removed": [], "moved": [], "unchanged": []}
+            slides: List[Slide] = []
+            for slide_id, spec in enumerate(plan):
+                old_index = previous_index.get(spec.key)
+                if spec.key in rebuilt:
+                    slide = self._design_slide(getattr(self, spec.builder)(slide_id, research_data, analysis_data,
+                                                                           topic, requirements))
+                    if old_index is None:
+                        diff["added"].append(slide_id)
+                    elif slide.same_content(previous.slides[old_index]):
+                        diff["unchanged"].append(slide_id)
+                    else:
+                        diff["changed"].append(slide_id)
+                else:
+                    slide = previous.slides[old_index].copy()
+                    slide.id = slide_id
+                    diff["unchanged"].append(slide_id)
+                    instrumentation.count("slides_reused")
+                if old_index is not None and previous.slides[old_index].id != slide_id:
+                    diff["moved"].append({"from": previous.slides[old_index].id, "to": slide_id})
+                slides.append(slide)
+
+        planned = {spec.key for spec in plan}
+        diff["removed"] = [previous.slides[index].id for key, index in previous_index.items() if key not in planned]
+        if previous_plan is None:
+            diff["removed"] = [slide.id for slide in previous.slides]
+
+        deck = Deck(topic, requirements, slides, plan=[spec.key for spec in plan], num_slides=num_slides)
+        return deck, diff
+
+    def generate_presentation_stream(self, topic: str, requirements: str = "", num_slides: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield each finished slide as a dict, as soon as it is ready"""
+        for slide in self.iter_slides(topic, requirements, num_slides):
+            yield slide.to_dict()
+
+    def iter_slides(self, topic: str, requirements: str = "", num_slides: Optional[int] = None) -> Iterator[Slide]:
+        """
+        Yield each slide as soon as the designer pass has been applied to it, without
+        materializing the deck. Research and analysis still run to completion first.
+        """
+        plan = plan_slides(num_slides, requirements)
+        research_data, analysis_data = PRESENTATION_GRAPH.run(self, TaskRequest(topic, requirements, plan), until="analysis")[:2]
+        
+        self._log("📋 Content Organizer: Streaming presentation content...")
+        for slide in self._iter_organizer_slides(research_data, analysis_data, topic, requirements, plan):
+            yield self._design_slide(slide)
+
+def generate_presentation_content(topic: str, requirements: str = "", num_slides: Optional[int] = None,
+                                  cache: Optional[ResultCache] = None,
+                                  search_backend: Optional[SearchBackend] = None) -> List[Dict[str, Any]]:
     """
     Generate professional presentation content using CrewAI-style multi-agent approach
     """
-    crew = PPTGeneratorCrew()
+    crew = PPTGeneratorCrew(cache=cache, search_backend=search_backend)
     return crew.generate_presentation(topic, requirements, num_slides)
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python crew_ai.py <topic> [requirements]")
-        sys.exit(1)
+def generate_presentation_stream(topic: str, requirements: str = "", num_slides: Optional[int] = None,
+                                 cache: Optional[ResultCache] = None,
+                                 search_backend: Optional[SearchBackend] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream finished slides one at a time; progress messages are suppressed so the
+    stream can be written straight to stdout
+    """
+    crew = PPTGeneratorCrew(verbose=False, cache=cache, search_backend=search_backend)
+    return crew.generate_presentation_stream(topic, requirements, num_slides)
+
+def regenerate_presentation(previous: Union[Deck, Dict[str, Any]], topic: Optional[str] = None,
+                            requirements: Optional[str] = None, num_slides: Any = _UNCHANGED,
+                            cache: Optional[ResultCache] = None,
+                            search_backend: Optional[SearchBackend] = None) -> Dict[str, Any]:
+    """
+    Regenerate a previously generated deck (a Deck or its to_dict() form) after its topic,
+    requirements or slide budget changed, reusing the slides the change does not affect.
+    Returns the new deck's to_dict() with a "diff" entry describing what changed.
+    """
+    if not isinstance(previous, Deck):
+        previous = Deck.from_dict(previous)
+    crew = PPTGeneratorCrew(verbose=False, cache=cache, search_backend=search_backend)
+    deck, diff = crew.regenerate_deck(previous, topic, requirements, num_slides)
+    result = deck.to_dict()
+    result["diff"] = diff
+    return result
+
+BatchTopic = Union[str, Tuple[str, str]]
+
+def batch_requests(topics: Iterable[BatchTopic], requirements: str = "",
+                   num_slides: Optional[int] = None) -> List[Tuple[str, str, Optional[int]]]:
+    """(topic, requirements, num_slides) per batch topic; a topic given as a string takes the shared requirements"""
+    return [
+        (item, requirements, num_slides) if isinstance(item, str) else (item[0], item[1], num_slides)
+        for item in topics
+    ]
+
+# Decks the batch CLI archives per slide-store transaction
+STORE_BATCH_SIZE = 256
+# Most decks a batch worker generates, and designs in one pass, per chunk
+DESIGN_BATCH_SIZE = 64
+
+BatchItem = Tuple[str, str, Optional[int], bool, Optional[Dict[str, Any]]]
+
+def make_search_backend(search_url: Optional[str] = None, knowledge_path: Optional[str] = None) -> Optional[SearchBackend]:
+    """The research agent's search backend: an HTTP endpoint, a local knowledge index, or None for mock data"""
+    if search_url and knowledge_path:
+        raise ValueError("Use either a search URL or a knowledge index, not both")
+    if search_url:
+        return HTTPSearchBackend(search_url)
+    if knowledge_path:
+        return KnowledgeIndex(knowledge_path)
+    return None
+
+class _BatchWorker:
+    """
+    A quiet crew, its result cache and search backend, and a handle on the batch's
+    checkpoint journal. Every task a worker runs shares one; the thread and serial
+    executors share a single one across all their threads.
+    """
+
+    __slots__ = ("crew", "journal")
+
+    def __init__(self, cache_path: Optional[str] = None, cache_ttl: Optional[float] = None,
+                 search_url: Optional[str] = None, knowledge_path: Optional[str] = None,
+                 journal_path: Optional[str] = None, job_id: Optional[str] = None):
+        self.crew = PPTGeneratorCrew(verbose=False, cache=ResultCache(ttl=cache_ttl, path=cache_path),
+                                     search_backend=make_search_backend(search_url, knowledge_path))
+        self.journal = CheckpointJournal(journal_path, job_id) if journal_path else None
+
+    def _hook(self, topic: str, requirements: str, num_slides: Optional[int]) -> Optional[Callable[[str, Any], None]]:
+        """Record each finished stage of a deck in the journal"""
+        if self.journal is None:
+            return None
+        return functools.partial(self.journal.record, deck_key(topic, requirements, num_slides))
+
+    def generate_chunk(self, items: Sequence[BatchItem]) -> List[Dict[str, Any]]:
+        """Generate a chunk of a batch with one designer pass over all its decks"""
+        requests = [item[:3] for item in items]
+        # Every item of a batch has the same as_decks
+        return self.crew.generate_batch(requests, [item[4] for item in items],
+                                        [self._hook(*request) for request in requests], as_decks=items[0][3])
+
+    def close(self):
+        if self.crew.cache is not None:
+            self.crew.cache.close()
+        if self.crew.search_backend is not None:
+            self.crew.search_backend.close()
+        if self.journal is not None:
+            self.journal.close()
+
+# The process pool's per-process worker, built once by the pool initializer
+_batch_worker: Optional[_BatchWorker] = None
+
+def _init_batch_worker(*args: Any):
+    """Process pool initializer; it runs once in each worker process"""
+    global _batch_worker
+    _batch_worker = _BatchWorker(*args)
+
+def _generate_batch_chunk(items: Sequence[BatchItem]) -> List[Dict[str, Any]]:
+    return _batch_worker.generate_chunk(items)
+
+def read_topics(stream: TextIO) -> Iterator[Tuple[str, str]]:
+    """
+    Read batch topics, one per line. A tab separates the topic from its requirements;
+    blank lines and lines starting with '#' are skipped.
+    """
+    for line in stream:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        topic, _, requirements = line.partition("\t")
+        yield topic.strip(), requirements.strip()
+
+def iter_presentations_batch(topics: Iterable[BatchTopic], requirements: str = "", num_slides: Optional[int] = None,
+                             max_workers: Optional[int] = None, executor: str = "process",
+                             chunksize: Optional[int] = None, cache_path: Optional[str] = None,
+                             cache_ttl: Optional[float] = None, as_decks: bool = False,
+                             search_url: Optional[str] = None,
+                             knowledge_path: Optional[str] = None, journal_path: Optional[str] = None,
+                             job_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Generate many decks across a worker pool, yielding one result per topic in input order.
+
+    executor is "process", "thread" or "serial". Each result is a dict with topic, requirements,
+    slides and error; a failing topic yields slides=None and the error message. Every worker
+    caches research and analysis results; cache_path shares them through an on-disk store.
+    With as_decks, slides is a compact Deck instead of a list of dicts. search_url points
+    each worker's research agent at an HTTP search endpoint; knowledge_path at a local
+    knowledge index, which the workers map into memory and share through the page cache.
+
+    With journal_path, every stage output is checkpointed to that journal under job_id
+    (by default derived from the batch's inputs). Rerunning an interrupted batch returns
+    its finished decks without recomputing them and resumes the others from their last
+    completed stage.
+    """
+    decks = batch_requests(topics, requirements, num_slides)
+    if not decks:
+        return
+    progress: Dict[str, Dict[str, Any]] = {}
+    if journal_path:
+        job_id = job_id or job_key(decks)
+        with CheckpointJournal(journal_path, job_id) as journal:
+            progress = journal.load()
+        if progress:
+            finished = sum(1 for stages in progress.values() if "design" in stages)
+            logger.info("Resuming job %s: %d decks finished, %d partly done", job_id, finished, len(progress) - finished)
+    if executor not in ("process", "thread", "serial"):
+        raise ValueError(f"Unknown executor '{executor}', expected 'process', 'thread' or 'serial'")
+    # A deck listed more than once is generated (and checkpointed) once; its repeats copy the result
+    keys = [deck_key(*deck) for deck in decks]
+    remaining = Counter(keys)
+    first: Dict[str, Tuple[str, str, Optional[int]]] = {}
+    for deck, key in zip(decks, keys):
+        first.setdefault(key, deck)
+    items = [deck + (as_decks, progress.get(key)) for key, deck in first.items()]
+    initargs = (cache_path, cache_ttl, search_url, knowledge_path, journal_path, job_id)
+    results = _run_batch_items(items, executor, max_workers, chunksize, initargs)
+    produced: Dict[str, Dict[str, Any]] = {}
+    try:
+        for (topic, reqs, _), key in zip(decks, keys):
+            if key in produced:
+                result = dict(produced[key], topic=topic, requirements=reqs,
+                              slides=copy.deepcopy(produced[key]["slides"]))
+            else:
+                result = produced[key] = next(results)
+            remaining[key] -= 1
+            if not remaining[key]:
+                del produced[key]
+            yield result
+    finally:
+        results.close()
+
+def _run_batch_items(items: List[BatchItem], executor: str, max_workers: Optional[int],
+                     chunksize: Optional[int], initargs: Tuple) -> Iterator[Dict[str, Any]]:
+    """Generate batch items in chunks on the chosen executor, yielding results in order"""
+    workers = max_workers or os.cpu_count() or 1
+    if chunksize is None:
+        # A few chunks per worker amortizes IPC without starving the tail of the batch
+        chunksize = DESIGN_BATCH_SIZE if executor == "serial" else \
+            max(1, min(DESIGN_BATCH_SIZE, len(items) // (workers * 4)))
+    chunks = [items[start:start + chunksize] for start in range(0, len(items), chunksize)]
+
+    if executor == "process":
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=initargs) as pool:
+            for results in pool.map(_generate_batch_chunk, chunks):
+                yield from results
+        return
+
+    # Threads share one crew (which is thread-safe), cache, search backend and journal
+    worker = _BatchWorker(*initargs)
+    try:
+        if executor == "serial":
+            for chunk in chunks:
+                yield from worker.generate_chunk(chunk)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for results in pool.map(worker.generate_chunk, chunks):
+                    yield from results
+    finally:
+        worker.close()
+
+def generate_presentations_batch(topics: Iterable[BatchTopic], requirements: str = "", num_slides: Optional[int] = None,
+                                 max_workers: Optional[int] = None, executor: str = "process",
+                                 chunksize: Optional[int] = None, cache_path: Optional[str] = None,
+                                 cache_ttl: Optional[float] = None, as_decks: bool = False,
+                                 search_url: Optional[str] = None,
+                                 knowledge_path: Optional[str] = None, journal_path: Optional[str] = None,
+                                 job_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Generate presentation content for many topics, returning results in input order
+    """
+    return list(iter_presentations_batch(topics, requirements, num_slides, max_workers, executor, chunksize,
+                                         cache_path, cache_ttl, as_decks, search_url, knowledge_path,
+                                         journal_path, job_id))
+
+def _run_batch_cli(args: argparse.Namespace) -> int:
+    """Run a batch from a topics file (or stdin), writing one result record per topic"""
+    if args.batch == "-":
+        topics = list(read_topics(sys.stdin))
+    else:
+        with open(args.batch, encoding="utf-8") as f:
+            topics = list(read_topics(f))
+
+    failures = 0
+    if args.pptx:
+        os.makedirs(args.pptx, exist_ok=True)
+    store = SlideStore(args.store) if args.store else None
+    pending: List[Deck] = []
+    try:
+        with _open_output(args) as stream, OutputWriter(stream, args.format or "ndjson") as writer:
+            for index, result in enumerate(iter_presentations_batch(
+                    topics, args.requirements or "", args.slides, max_workers=args.workers, executor=args.executor,
+                    cache_path=args.cache, cache_ttl=args.cache_ttl, as_decks=store is not None,
+                    search_url=args.search_url, knowledge_path=args.knowledge,
+                    journal_path=args.journal, job_id=args.job_id)):
+                if result["error"]:
+                    failures += 1
+                elif args.pptx or store is not None:
+                    if args.pptx:
+                        export_pptx(result["slides"], os.path.join(args.pptx, f"deck-{index + 1:05d}.pptx"),
+                                    title=result["topic"])
+                    if store is not None:
+                        pending.append(result["slides"])
+                        result = dict(result, slides=result["slides"].to_list())
+                        if len(pending) >= STORE_BATCH_SIZE:
+                            store.put_decks(pending)
+                            pending.clear()
+                writer.write(result)
+        if pending:
+            store.put_decks(pending)
+    finally:
+        if store is not None:
+            store.close()
+    logger.info("🎯 Batch complete: %d/%d decks generated", len(topics) - failures, len(topics))
+    return 1 if failures else 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate presentation content with the CrewAI-style agent crew")
+    parser.add_argument("topic", nargs="?", help="presentation topic")
+    parser.add_argument("requirements", nargs="?", default="", help="additional requirements")
+    parser.add_argument("--slides", type=int, default=None, metavar="N",
+                        help="slide budget (default: the standard deck; at most 12, or 13 with requirements)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="generate one deck per line of FILE ('-' for stdin); a tab separates topic and requirements")
+    parser.add_argument("--workers", type=int, default=None, help="batch worker count (default: CPU count)")
+    parser.add_argument("--executor", choices=("process", "thread", "serial"), default="process",
+                        help="batch worker pool type")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="output format (default: json for one deck, ndjson for --batch)")
+    parser.add_argument("--output", metavar="PATH", help="write output to PATH instead of stdout")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="write each slide as one JSON line as soon as it is ready")
+    parser.add_argument("--pptx", metavar="PATH",
+                        help="also export the deck as a .pptx file (with --batch: a directory, one file per topic)")
+    parser.add_argument("--store", metavar="PATH",
+                        help="archive generated decks in a deduplicating SQLite slide store")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="checkpoint every batch stage to PATH; rerunning the batch resumes where it stopped")
+    parser.add_argument("--job-id", metavar="ID",
+                        help="job id for --journal (default: derived from the batch's topics and options)")
+    parser.add_argument("--cache", metavar="PATH", help="persist research/analysis results in a SQLite file")
+    parser.add_argument("--cache-ttl", type=float, default=None, metavar="SECONDS",
+                        help="expire cached results after SECONDS")
+    parser.add_argument("--search-url", metavar="URL",
+                        help="JSON search endpoint for the research agent (GET URL?q=...&limit=...)")
+    parser.add_argument("--knowledge", metavar="DIR",
+                        help="research from a local knowledge index (build one with knowledge_index.py add)")
+    parser.add_argument("--log-level", default="INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+                        help="pipeline log level; logs go to stderr")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+    parser.add_argument("--metrics", action="store_true",
+                        help="collect timing spans and counters and print them to stderr at exit")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a persistent JSON-RPC worker on stdin/stdout (or --socket)")
+    parser.add_argument("--socket", metavar="PATH", help="Unix socket path for --serve")
+    args = parser.parse_args(argv)
+    if args.format and args.format not in available_formats():
+        parser.error(f"--format {args.format} is not available here (install the msgpack package)")
+    if args.search_url and args.knowledge:
+        parser.error("--search-url and --knowledge cannot be combined")
+    if args.slides is not None and args.slides < 1:
+        parser.error("--slides must be at least 1")
+
+    logging.basicConfig(stream=sys.stderr, format="%(message)s",
+                        level=logging.WARNING if args.quiet else getattr(logging, args.log_level))
+    if args.metrics:
+        instrumentation.enable()
+    try:
+        return _run_cli(args)
+    finally:
+        if args.metrics:
+            print(json.dumps(instrumentation.snapshot(), indent=2), file=sys.stderr)
+
+def _run_cli(args: argparse.Namespace) -> int:
+    if args.serve:
+        import crew_server
+        cache = ResultCache(ttl=args.cache_ttl, path=args.cache) if args.cache else None
+        return crew_server.serve(args.socket, args.workers, cache,
+                                 search_backend=make_search_backend(args.search_url, args.knowledge))
+
+    if args.batch:
+        return _run_batch_cli(args)
+
+    if not args.topic:
+        print("Usage: python crew_ai.py <topic> [requirements]", file=sys.stderr)
+        return 1
     
-    topic = sys.argv[1]
-    requirements = sys.argv[2] if len(sys.argv) > 2 else ""
+    topic = args.topic
+    requirements = args.requirements
+    cache = ResultCache(ttl=args.cache_ttl, path=args.cache) if args.cache else None
+    search_backend = make_search_backend(args.search_url, args.knowledge)
+    try:
+        return _generate_cli(args, topic, requirements, cache, search_backend)
+    finally:
+        if cache is not None:
+            cache.close()
+        if search_backend is not None:
+            search_backend.close()
+
+def _open_output(args: argparse.Namespace) -> ContextManager[BinaryIO]:
+    """The binary stream data is written to; stdout is left open when the writer is done"""
+    if args.output:
+        return open(args.output, "wb")
+    return contextlib.nullcontext(sys.stdout.buffer)
+
+def _stream_slides(args: argparse.Namespace, crew: PPTGeneratorCrew, topic: str, requirements: str) -> List[Dict[str, Any]]:
+    """
+    Generate the deck slide by slide, adding each to the --pptx file and, with --ndjson,
+    writing it out as soon as it is ready. Returns the slides unless --ndjson streamed
+    them and nothing else needs them.
+    """
+    slides: List[Dict[str, Any]] = []
+    keep = not args.ndjson or bool(args.store)
+    with contextlib.ExitStack() as stack:
+        pptx = stack.enter_context(PptxWriter(args.pptx, title=topic)) if args.pptx else None
+        ndjson = stack.enter_context(OutputWriter(stack.enter_context(_open_output(args)), "ndjson", flush=True)) \
+            if args.ndjson else None
+        for slide in crew.iter_slides(topic, requirements, args.slides):
+            record = slide.to_dict()
+            if ndjson is not None:
+                ndjson.write(record)
+            if pptx is not None:
+                pptx.add_slide(slide)
+            if keep:
+                slides.append(record)
+    if args.pptx:
+        logger.info("📦 Exported %s", args.pptx)
+    return slides
+
+def _archive(args: argparse.Namespace, slides: List[Dict[str, Any]], topic: str, requirements: str):
+    with SlideStore(args.store) as store:
+        logger.info("🗄️ Archived as deck %d in %s", store.put_deck(Deck.from_list(slides, topic, requirements)), args.store)
+
+def _generate_cli(args: argparse.Namespace, topic: str, requirements: str, cache: Optional[ResultCache],
+                  search_backend: Optional[SearchBackend]) -> int:
+    if args.ndjson:
+        # Progress messages are suppressed so the stream can go straight to stdout
+        crew = PPTGeneratorCrew(verbose=False, cache=cache, search_backend=search_backend)
+        slides = _stream_slides(args, crew, topic, requirements)
+        if args.store:
+            _archive(args, slides, topic, requirements)
+        return 0
     
-    print(f"🚀 Starting CrewAI PPT Generation for: {topic}")
-    print(f"📋 Additional Requirements: {requirements or 'None'}")
-    print("-" * 50)
+    logger.info("🚀 Starting CrewAI PPT Generation for: %s", topic)
+    logger.info("📋 Additional Requirements: %s", requirements or 'None')
+    logger.info("-" * 50)
     
-    slides = generate_presentation_content(topic, requirements)
+    crew = PPTGeneratorCrew(cache=cache, search_backend=search_backend)
+    if args.pptx:
+        slides = _stream_slides(args, crew, topic, requirements)
+    else:
+        slides = crew.generate_presentation(topic, requirements, args.slides)
     
-    print("\n" + "="*50)
-    print("📄 GENERATED PRESENTATION SUMMARY")
-    print("="*50)
+    logger.info("\n" + "="*50)
+    logger.info("📄 GENERATED PRESENTATION SUMMARY")
+    logger.info("="*50)
     for slide in slides:
-        print(f"Slide {slide['id'] + 1}: {slide['title']} ({slide['slideType']})")
+        logger.info("Slide %d: %s (%s)", slide['id'] + 1, slide['title'], slide['slideType'])
         if 'agent_source' in slide:
-            print(f"  👥 Created by: {slide['agent_source']}")
+            logger.info("  👥 Created by: %s", slide['agent_source'])
     
-    print(f"\n🎯 Total Slides Generated: {len(slides)}")
-    print(json.dumps(slides, indent=2))
+    logger.info("\n🎯 Total Slides Generated: %d", len(slides))
+    if args.store:
+        _archive(args, slides, topic, requirements)
+    with _open_output(args) as stream, OutputWriter(stream, args.format or "json") as writer:
+        writer.write_all(slides)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from batch_designer import design_slides
+from crew_ai import PPTGeneratorCrew, generate_presentations_batch
+from output_formats import OutputWriter, available_formats
+
+# Reproducible benchmarks for the generation pipeline. Every case reports latency
+# percentiles, throughput and allocation figures; results are written as JSON so runs
+# from different commits can be compared with --compare.
+
+TOPICS = {
+    "short": "AI",
+    "medium": "Artificial Intelligence in Healthcare Diagnostics",
+    "long": "The impact of generative artificial intelligence on regulated financial services, "
+            "including risk management, compliance automation and customer experience across global markets"
+}
+
+REQUIREMENTS = {
+    "none": "",
+    "with": "cost reduction, regulatory compliance and a 12 month rollout plan"
+}
+
+DEFAULT_BATCH_SIZES = (1, 10, 100, 1000)
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def _memory_profile(operation: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    """
+    Allocation figures for operation, measured separately because tracing slows timing.
+
+    peak_bytes_per_op is the mean of each call's high-water mark above the memory live
+    before it: what one operation holds allocated at once, a lower bound on what it
+    allocates. net_blocks_per_op and net_bytes_per_op are the change in live memory
+    blocks and bytes, so they only grow when operations leave memory behind.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        peak, op_peaks = start, 0
+        for _ in range(iterations):
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            operation()
+            _, op_peak = tracemalloc.get_traced_memory()
+            op_peaks += op_peak - base
+            peak = max(peak, op_peak)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    return {
+        "peak_bytes": peak - start,
+        "peak_bytes_per_op": op_peaks / iterations,
+        "net_blocks_per_op": sum(stat.count_diff for stat in stats) / iterations,
+        "net_bytes_per_op": sum(stat.size_diff for stat in stats) / iterations
+    }
+
+def measure(name: str, operation: Callable[[], Any], iterations: int, warmup: int = 10,
+            units_per_op: int = 1, memory: bool = True, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Time operation over iterations and summarize latency (µs), throughput and memory"""
+    for _ in range(warmup):
+        operation()
+
+    samples = []
+    clock = time.perf_counter_ns
+    total_start = clock()
+    for _ in range(iterations):
+        start = clock()
+        operation()
+        samples.append((clock() - start) / 1000)
+    total_seconds = (clock() - total_start) / 1e9
+    samples.sort()
+
+    result = {
+        "name": name,
+        "params": params or {},
+        "iterations": iterations,
+        "latency_us": {
+            "min": samples[0],
+            "p50": _percentile(samples, 0.50),
+            "p90": _percentile(samples, 0.90),
+            "p99": _percentile(samples, 0.99),
+            "max": samples[-1],
+            "mean": sum(samples) / len(samples)
+        },
+        "throughput_per_s": iterations * units_per_op / total_seconds if total_seconds else 0.0
+    }
+    if memory:
+        result["memory"] = _memory_profile(operation, max(1, min(iterations, 100)))
+    return result
+
+def stage_cases(iterations: int) -> List[Dict[str, Any]]:
+    """Benchmark each agent stage and the end-to-end pipeline for every topic/requirements mix"""
+    crew = PPTGeneratorCrew(verbose=False)
+    results = []
+    for topic_size, topic in TOPICS.items():
+        for requirements_kind, requirements in REQUIREMENTS.items():
+            params = {"topic": topic_size, "requirements": requirements_kind}
+            research = crew._execute_research_agent(topic, requirements)
+            analysis = crew._execute_analyst_agent(research, topic, requirements)
+
+            results.append(measure("stage.research", lambda: crew._execute_research_agent(topic, requirements),
+                                   iterations, params=params))
+            results.append(measure("stage.analyst", lambda: crew._execute_analyst_agent(research, topic, requirements),
+                                   iterations, params=params))
+            results.append(measure("stage.organizer",
+                                   lambda: crew._execute_organizer_agent(research, analysis, topic, requirements),
+                                   iterations, params=params))
+            # The designer mutates its input, so every timed call gets a freshly organized deck
+            decks = [crew._execute_organizer_agent(research, analysis, topic, requirements)
+                     for _ in range(iterations + 10)]
+            results.append(measure("stage.designer", lambda: crew._execute_designer_agent(decks.pop(), topic),
+                                   iterations, params=params, memory=False))
+            results.append(measure("end_to_end", lambda: crew.generate_deck(topic, requirements),
+                                   iterations, params=params))
+    return results
+
+def batch_cases(batch_sizes: List[int], executor: str, max_workers: Optional[int]) -> List[Dict[str, Any]]:
+    """Benchmark batch generation; throughput is reported in decks per second"""
+    results = []
+    for size in batch_sizes:
+        topics = [(f"{TOPICS['medium']} #{i}", REQUIREMENTS["with"] if i % 2 else "") for i in range(size)]
+        iterations = max(1, min(20, 1000 // size))
+        results.append(measure(
+            "batch",
+            lambda: generate_presentations_batch(topics, max_workers=max_workers, executor=executor),
+            iterations, warmup=1, units_per_op=size, memory=size <= 10000,
+            params={"batch_size": size, "executor": executor, "workers": max_workers or os.cpu_count()}
+        ))
+    return results
+
+def designer_cases(iterations: int, batch_size: int = 64) -> List[Dict[str, Any]]:
+    """Benchmark the designer pass over a batch of organized decks with distinct topics; throughput is in decks"""
+    crew = PPTGeneratorCrew(verbose=False)
+    rounds = max(1, iterations // batch_size)
+    results = []
+    for topic_size, topic in TOPICS.items():
+        organized = []
+        for i in range((rounds + 2) * batch_size):
+            name = f"{topic} #{i}"
+            research = crew._execute_research_agent(name, REQUIREMENTS["with"])
+            analysis = crew._execute_analyst_agent(research, name, REQUIREMENTS["with"])
+            organized.append(crew._execute_organizer_agent(research, analysis, name, REQUIREMENTS["with"]))
+        # The designer mutates its input, so every timed call gets decks it has not seen
+        batches = [organized[start:start + batch_size] for start in range(0, len(organized), batch_size)]
+        results.append(measure("designer.batch", lambda: design_slides(batches.pop()), rounds, warmup=2,
+                               units_per_op=batch_size, memory=False,
+                               params={"topic": topic_size, "batch_size": batch_size}))
+    return results
+
+def serialization_cases(iterations: int, batch_size: int = 100) -> List[Dict[str, Any]]:
+    """Benchmark writing a batch of results in each available output format; bytes per batch are reported"""
+    results = generate_presentations_batch([f"{TOPICS['medium']} #{i}" for i in range(batch_size)],
+                                           REQUIREMENTS["with"], executor="serial")
+    cases = []
+    for format in available_formats():
+        sink = io.BytesIO()
+        OutputWriter(sink, format).write_all(results)
+        case = measure("serialize", lambda: OutputWriter(io.BytesIO(), format).write_all(results),
+                       max(1, iterations // 10), units_per_op=batch_size,
+                       params={"format": format, "batch_size": batch_size})
+        case["bytes"] = len(sink.getvalue())
+        cases.append(case)
+    return cases
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(iterations: int = 1000, batch_sizes: List[int] = DEFAULT_BATCH_SIZES, executor: str = "serial",
+        max_workers: Optional[int] = None) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": stage_cases(iterations) + designer_cases(iterations) + serialization_cases(iterations)
+                   + batch_cases(batch_sizes, executor, max_workers)
+    }
+
+def _case_key(result: Dict[str, Any]) -> str:
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[str]:
+    """Return a line per case whose p50 latency regressed by more than threshold"""
+    previous = {_case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        old, new = before["latency_us"]["p50"], result["latency_us"]["p50"]
+        if old and (new - old) / old > threshold:
+            regressions.append(f"{result['name']} {result['params']}: p50 {old:.1f}µs -> {new:.1f}µs "
+                               f"(+{(new - old) / old:.0%})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CrewAI presentation pipeline")
+    parser.add_argument("--iterations", type=int, default=1000, help="timed iterations per stage case")
+    parser.add_argument("--batch-sizes", default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+                        help="comma-separated batch sizes, e.g. 1,100,100000")
+    parser.add_argument("--executor", choices=("process", "thread", "serial"), default="serial",
+                        help="worker pool for batch cases")
+    parser.add_argument("--workers", type=int, default=None, help="batch worker count")
+    parser.add_argument("--output", metavar="FILE", help="write results as JSON to FILE (default: stdout)")
+    parser.add_argument("--compare", metavar="BASELINE", help="report p50 regressions against a previous run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold for --compare")
+    args = parser.parse_args(argv)
+
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size.strip()]
+    report = run(args.iterations, batch_sizes, args.executor, args.workers)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    for result in report["results"]:
+        latency = result["latency_us"]
+        print(f"{result['name']:<16} {json.dumps(result['params']):<60} p50 {latency['p50']:>10.1f}µs  "
+              f"p99 {latency['p99']:>10.1f}µs  {result['throughput_per_s']:>12.1f}/s", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"⚠️  Regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
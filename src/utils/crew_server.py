@@ -0,0 +1,385 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple
+
+from crew_ai import PPTGeneratorCrew, batch_requests, make_search_backend
+from instrumentation import logger
+from request_coordinator import DeadlineExceeded, GenerationCoordinator, Overloaded, Ticket
+from result_cache import ResultCache
+from search_backend import SearchBackend
+from slide_model import Deck
+
+# Long-running worker: the interpreter, module imports and the crew stay warm across
+# requests, so each deck only pays for generation and JSON encoding. Requests are
+# JSON-RPC 2.0 objects, one per line, over stdin/stdout or a Unix socket.
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+# Implementation-defined server errors
+OVERLOADED = -32000
+DEADLINE_EXCEEDED = -32001
+REQUEST_CANCELLED = -32002
+
+class RPCError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+def _check_num_slides(num_slides: Any):
+    if num_slides is not None and (not isinstance(num_slides, int) or isinstance(num_slides, bool) or num_slides < 1):
+        raise RPCError(INVALID_PARAMS, "num_slides must be a positive integer or null")
+
+class CrewServer:
+    """Dispatches JSON-RPC requests to one shared, warm PPTGeneratorCrew"""
+
+    def __init__(self, crew: Optional[PPTGeneratorCrew] = None, max_workers: Optional[int] = None,
+                 max_queue: int = 64, timeout: Optional[float] = None):
+        self.crew = crew or PPTGeneratorCrew(verbose=False, cache=ResultCache())
+        self.max_workers = max_workers
+        # generate and generate_batch requests are coalesced and admission-controlled; the
+        # coordinator's threads run the crew while the dispatching threads only wait
+        self.coordinator = GenerationCoordinator(self.crew.generate_presentation, max_workers=max_workers or 4,
+                                                 max_queue=max_queue, timeout=timeout)
+        # In-flight request tickets by (session, JSON-RPC id): ids are only unique per client
+        self._tickets: Dict[Tuple[Any, Any], Ticket] = {}
+        self._current = threading.local()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.shutdown_requested = threading.Event()
+        self.methods: Dict[str, Callable[..., Any]] = {
+            "generate": self.generate,
+            "generate_batch": self.generate_batch,
+            "regenerate": self.regenerate,
+            "cancel": self.cancel,
+            "health": self.health,
+            "shutdown": self.request_shutdown
+        }
+
+    def generate(self, topic: str, requirements: str = "", num_slides: Optional[int] = None,
+                 priority: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Lower priority values are served first; timeout (seconds) bounds the whole request"""
+        _check_num_slides(num_slides)
+        return self._await(lambda: self.coordinator.submit(topic, requirements, num_slides, priority, timeout))
+
+    def generate_batch(self, topics: List[Any], requirements: str = "", num_slides: Optional[int] = None,
+                       priority: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Generate a deck per topic in one designer pass; queued, prioritised and cancelled like generate"""
+        _check_num_slides(num_slides)
+        requests = batch_requests(topics, requirements, num_slides)
+        key = json.dumps(["batch", [self.coordinator.make_key(*request) for request in requests]])
+        return self._await(lambda: self.coordinator.submit_call(key, self.crew.generate_batch, (requests,),
+                                                                priority, timeout))
+
+    def _await(self, submit: Callable[[], Ticket]) -> Any:
+        """Admit a request through the coordinator and wait for it, cancellable by its JSON-RPC id"""
+        ticket_key = getattr(self._current, "ticket_key", None)
+        try:
+            ticket = submit()
+        except Overloaded as exc:
+            raise RPCError(OVERLOADED, str(exc))
+        except DeadlineExceeded as exc:
+            raise RPCError(DEADLINE_EXCEEDED, str(exc))
+        if ticket_key is not None:
+            with self._lock:
+                self._tickets[ticket_key] = ticket
+        try:
+            return ticket.result()
+        except (Overloaded, DeadlineExceeded) as exc:
+            raise RPCError(OVERLOADED if isinstance(exc, Overloaded) else DEADLINE_EXCEEDED, str(exc))
+        except CancelledError:
+            raise RPCError(REQUEST_CANCELLED, "Request cancelled")
+        finally:
+            if ticket_key is not None:
+                with self._lock:
+                    if self._tickets.get(ticket_key) is ticket:
+                        del self._tickets[ticket_key]
+
+    def cancel(self, id: Any) -> Dict[str, Any]:
+        """Cancel an in-flight generate or generate_batch request of the same client by its JSON-RPC id"""
+        with self._lock:
+            ticket = self._tickets.get(self._ticket_key(getattr(self._current, "session", None), id))
+        return {"cancelled": ticket is not None and ticket.cancel()}
+
+    def regenerate(self, previous: Dict[str, Any], **changes: Any) -> Dict[str, Any]:
+        """
+        Rebuild a deck from its to_dict() form; topic, requirements and num_slides are
+        optional and default to the previous deck's. Unaffected slides are reused.
+        """
+        unknown = set(changes) - {"topic", "requirements", "num_slides"}
+        if unknown:
+            raise TypeError(f"regenerate() got unexpected parameters: {', '.join(sorted(unknown))}")
+        _check_num_slides(changes.get("num_slides"))
+        deck, diff = self.crew.regenerate_deck(Deck.from_dict(previous), **changes)
+        result = deck.to_dict()
+        result["diff"] = diff
+        return result
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            status = {
+                "status": "stopping" if self.shutdown_requested.is_set() else "ok",
+                "pid": os.getpid(),
+                "uptime": time.time() - self.started,
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight
+            }
+        status["coordinator"] = self.coordinator.snapshot()
+        if self.crew.cache is not None:
+            status["cache"] = self.crew.cache.stats.to_dict()
+        return status
+
+    def request_shutdown(self) -> Dict[str, Any]:
+        self.shutdown_requested.set()
+        return {"status": "stopping"}
+
+    @staticmethod
+    def _ticket_key(session: Any, request_id: Any) -> Optional[Tuple[Any, Any]]:
+        if request_id is None or not isinstance(request_id, (str, int, float)):
+            return None
+        return session, request_id
+
+    def dispatch(self, request: Any, session: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Handle one decoded request; returns None for notifications (requests without an id).
+        session identifies the client connection, which scopes request ids for cancel.
+        """
+        request_id = request.get("id") if isinstance(request, dict) else None
+        self._current.session = session
+        self._current.ticket_key = self._ticket_key(session, request_id)
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+        try:
+            if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+                raise RPCError(INVALID_REQUEST, "Invalid request")
+            method = self.methods.get(request["method"])
+            if method is None:
+                raise RPCError(METHOD_NOT_FOUND, f"Method not found: {request['method']}")
+            params = request.get("params", {})
+            try:
+                if isinstance(params, dict):
+                    result = method(**params)
+                elif isinstance(params, list):
+                    result = method(*params)
+                else:
+                    raise RPCError(INVALID_PARAMS, "params must be an object or an array")
+            except TypeError as exc:
+                raise RPCError(INVALID_PARAMS, str(exc))
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RPCError as exc:
+            response = self._error(request_id, exc.code, exc.message)
+        except Exception as exc:
+            response = self._error(request_id, INTERNAL_ERROR, f"{type(exc).__name__}: {exc}")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+        if isinstance(request, dict) and "id" not in request:
+            return None
+        return response
+
+    def _error(self, request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        with self._lock:
+            self.errors += 1
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+    def handle_line(self, line: str, session: Any = None) -> Optional[str]:
+        """Handle one newline-delimited request, returning the encoded response line"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return json.dumps(self._error(None, PARSE_ERROR, "Parse error")) + "\n"
+        response = self.dispatch(request, session)
+        return json.dumps(response) + "\n" if response is not None else None
+
+class _ShutdownSignal(Exception):
+    pass
+
+def serve_stdio(server: CrewServer, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout):
+    """
+    Serve requests read from stdin, writing responses to stdout as they complete.
+    Requests run concurrently, so responses may arrive out of order; match them by id.
+    """
+    write_lock = threading.Lock()
+
+    def respond(line: str):
+        response = server.handle_line(line)
+        if response is not None:
+            with write_lock:
+                stdout.write(response)
+                stdout.flush()
+
+    def on_signal(signum, frame):
+        server.shutdown_requested.set()
+        raise _ShutdownSignal()
+
+    previous = {signum: signal.signal(signum, on_signal) for signum in (signal.SIGTERM, signal.SIGINT)}
+    pool = ThreadPoolExecutor(max_workers=server.max_workers)
+    try:
+        for line in stdin:
+            if line.strip():
+                pool.submit(respond, line)
+            if server.shutdown_requested.is_set():
+                break
+    except _ShutdownSignal:
+        pass
+    finally:
+        # Graceful shutdown: stop reading, finish the requests already accepted
+        pool.shutdown(wait=True)
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        with self.server.connections_lock:
+            self.server.connections.add(self.connection)
+
+    def finish(self):
+        with self.server.connections_lock:
+            self.server.connections.discard(self.connection)
+        super().finish()
+
+    def handle(self):
+        crew_server: CrewServer = self.server.crew_server
+        write_lock = threading.Lock()
+
+        def respond(line: str):
+            # The handler is the session, so request ids only need to be unique per connection
+            response = crew_server.handle_line(line, session=self)
+            if response is not None:
+                with write_lock:
+                    try:
+                        self.wfile.write(response.encode("utf-8"))
+                        self.wfile.flush()
+                    except OSError:
+                        pass  # The client hung up; the other requests still finish
+            if crew_server.shutdown_requested.is_set():
+                self.server.stop()
+
+        # A connection's requests run concurrently, as on stdio, so a client can cancel its own
+        # in-flight request; responses may arrive out of order
+        pool = ThreadPoolExecutor(max_workers=crew_server.max_workers)
+        try:
+            for raw in self.rfile:
+                line = raw.decode("utf-8")
+                if line.strip():
+                    pool.submit(respond, line)
+                if crew_server.shutdown_requested.is_set():
+                    break
+        finally:
+            pool.shutdown(wait=True)
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, path: str, crew_server: CrewServer):
+        super().__init__(path, _RequestHandler)
+        self.crew_server = crew_server
+        self.connections = set()
+        self.connections_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def stop(self):
+        """Stop serving from any thread; serve_unix then closes the open connections"""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def close_idle_connections(self):
+        """End the read side of open connections so their handlers finish the current request and exit"""
+        with self.connections_lock:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RD)
+            except OSError:
+                pass
+
+def serve_unix(server: CrewServer, path: str):
+    """
+    Serve requests over a Unix socket at path; each connection carries newline-delimited
+    requests and connections are handled concurrently.
+    """
+    if os.path.exists(path):
+        os.unlink(path)
+    unix_server = _ThreadingUnixServer(path, server)
+
+    def on_signal(signum, frame):
+        server.shutdown_requested.set()
+        unix_server.stop()
+
+    previous = {signum: signal.signal(signum, on_signal) for signum in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        unix_server.serve_forever()
+    finally:
+        # server_close waits for open connections to finish their current request
+        unix_server.close_idle_connections()
+        unix_server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+def serve(socket_path: Optional[str] = None, max_workers: Optional[int] = None,
+          cache: Optional[ResultCache] = None, max_queue: int = 64, timeout: Optional[float] = None,
+          search_backend: Optional[SearchBackend] = None) -> int:
+    """
+    Run the worker until shutdown, on a Unix socket if socket_path is given, else on stdio.
+    The worker owns cache and search_backend and closes them when it stops.
+    """
+    crew = PPTGeneratorCrew(verbose=False, cache=cache or ResultCache(), search_backend=search_backend)
+    server = CrewServer(crew, max_workers=max_workers, max_queue=max_queue, timeout=timeout)
+    if socket_path:
+        logger.info("🚀 CrewAI worker listening on %s", socket_path)
+        serve_unix(server, socket_path)
+    else:
+        serve_stdio(server)
+    server.coordinator.close()
+    if crew.cache is not None:
+        crew.cache.close()
+    if search_backend is not None:
+        search_backend.close()
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Persistent CrewAI presentation worker (JSON-RPC)")
+    parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of stdin/stdout")
+    parser.add_argument("--workers", type=int, default=None, help="concurrent request limit for stdio mode")
+    parser.add_argument("--cache", metavar="PATH", help="persist research/analysis results in a SQLite file")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="distinct generate/generate_batch requests allowed to wait; beyond that low-priority work is shed")
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                        help="default deadline for generate and generate_batch requests")
+    parser.add_argument("--search-url", metavar="URL",
+                        help="JSON search endpoint for the research agent (GET URL?q=...&limit=...)")
+    parser.add_argument("--knowledge", metavar="DIR",
+                        help="research from a local knowledge index (build one with knowledge_index.py add)")
+    args = parser.parse_args(argv)
+    if args.search_url and args.knowledge:
+        parser.error("--search-url and --knowledge cannot be combined")
+    logging.basicConfig(stream=sys.stderr, format="%(message)s", level=logging.INFO)
+    cache = ResultCache(path=args.cache) if args.cache else None
+    return serve(args.socket, args.workers, cache, args.max_queue, args.timeout,
+                 make_search_backend(args.search_url, args.knowledge))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+# Pipeline instrumentation: timing spans and counters delivered to pluggable hooks.
+# While no hook is registered and collection is off, span() hands back a shared no-op
+# context manager and count() returns immediately, so the hot path pays almost nothing.
+
+logger = logging.getLogger("crew_ai")
+
+Event = Dict[str, Any]
+Hook = Callable[[Event], None]
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("_owner", "name", "attrs", "_start")
+
+    def __init__(self, owner: "Instrumentation", name: str, attrs: Dict[str, Any]):
+        self._owner = owner
+        self.name = name
+        self.attrs = attrs
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self._start
+        self._owner._record_span(self.name, duration_ns, self.attrs, exc_type.__name__ if exc_type else None)
+        return False
+
+class Instrumentation:
+    """
+    Collects timing spans and counters for the pipeline and forwards them to hooks.
+
+    A hook is a callable receiving one event dict per span ("type": "span", with name,
+    duration_ns, attrs and error) or counter increment ("type": "counter", with name and
+    value). Aggregates are also kept in-process and returned by snapshot().
+    """
+
+    def __init__(self):
+        self._hooks: List[Hook] = []
+        self._collect = False
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.timings: Dict[str, Dict[str, int]] = {}
+
+    def _refresh(self):
+        self.enabled = self._collect or bool(self._hooks)
+
+    def add_hook(self, hook: Hook):
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+            self._refresh()
+
+    def remove_hook(self, hook: Hook):
+        with self._lock:
+            self._hooks = [registered for registered in self._hooks if registered is not hook]
+            self._refresh()
+
+    def enable(self, collect: bool = True):
+        """Aggregate counters and timings even when no hook is registered"""
+        with self._lock:
+            self._collect = collect
+            self._refresh()
+
+    def span(self, name: str, **attrs: Any):
+        """Context manager timing the enclosed block"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            hooks = self._hooks
+        self._emit(hooks, {"type": "counter", "name": name, "value": value})
+
+    def _record_span(self, name: str, duration_ns: int, attrs: Dict[str, Any], error):
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = {"count": 0, "total_ns": 0, "max_ns": 0, "errors": 0}
+            timing["count"] += 1
+            timing["total_ns"] += duration_ns
+            timing["max_ns"] = max(timing["max_ns"], duration_ns)
+            if error:
+                timing["errors"] += 1
+            hooks = self._hooks
+        self._emit(hooks, {"type": "span", "name": name, "duration_ns": duration_ns, "attrs": attrs, "error": error})
+
+    def _emit(self, hooks: List[Hook], event: Event):
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception:
+                # A broken exporter must never fail deck generation
+                logger.exception("Instrumentation hook %r failed", hook)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": {name: dict(timing) for name, timing in self.timings.items()}
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+# Process-wide instance used by the pipeline
+instrumentation = Instrumentation()
@@ -0,0 +1,479 @@
+import argparse
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from instrumentation import instrumentation, logger
+from search_backend import SearchBackend, SearchResult
+
+# Offline retrieval for the Research Specialist: a BM25 index over a local corpus.
+#
+# Documents are split into passages, and each add_documents() call writes one immutable
+# segment file that is memory-mapped read-only, so opening an index costs nothing up
+# front and worker processes share the pages through the OS cache. A segment holds a
+# sorted term dictionary (binary-searched in place), impact-ordered postings (each
+# posting carries its precomputed, quantized BM25 term weight, highest first, so a query
+# can stop after the best postings of each term) and the passages themselves. The
+# manifest lists the live segments; re-adding a document hides its older passages
+# through a tombstone until optimize() merges the segments.
+#
+# One process should write an index at a time; any number may read it.
+
+_MAGIC = b"KIX1"
+# magic, byte order flag, then counts and section offsets (see _Segment)
+_HEADER = struct.Struct("<4sI11Q")
+_MANIFEST = "manifest.json"
+# Manifest re-reads when a listed segment has been merged away mid-refresh
+_REFRESH_ATTEMPTS = 5
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their this to was were "
+    "will with".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+_IMPACT_SCALE = 65535 / (K1 + 1)
+
+# Words per passage when splitting documents
+PASSAGE_WORDS = 80
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+def split_passages(text: str, words: int = PASSAGE_WORDS) -> List[str]:
+    """Split a document into passages of about `words` words, keeping paragraphs together when they fit"""
+    passages: List[str] = []
+    current: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        tokens = paragraph.split()
+        if current and len(current) + len(tokens) > words:
+            passages.append(" ".join(current))
+            current = []
+        while len(tokens) > words:
+            passages.append(" ".join(tokens[:words]))
+            tokens = tokens[words:]
+        current.extend(tokens)
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+def _doc_hash(doc_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(doc_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+class _Segment:
+    """A read-only, memory-mapped segment file"""
+
+    def __init__(self, path: str, sequence: int):
+        self.path = path
+        self.sequence = sequence
+        # Queries using the segment, and whether the index has dropped it; guarded by the index's lock
+        self.refs = 0
+        self.retired = False
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, little_endian, self.term_count, self.passage_count, self.total_length,
+         term_offsets, term_blob, posting_offsets, postings, passage_offsets, passage_lengths,
+         passage_blob, doc_hashes) = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a knowledge index segment")
+        if bool(little_endian) != (sys.byteorder == "little"):
+            raise ValueError(f"{path} was written on a machine with a different byte order")
+        view = memoryview(self._mmap)
+        self._term_offsets = view[term_offsets:term_blob].cast("Q")
+        self._term_blob = term_blob
+        self._posting_offsets = view[posting_offsets:postings].cast("Q")
+        self._postings = postings
+        self._passage_offsets = view[passage_offsets:passage_lengths].cast("Q")
+        self.passage_lengths = view[passage_lengths:passage_blob].cast("I")
+        self._passage_blob = passage_blob
+        self.doc_hashes = view[doc_hashes:].cast("Q")
+        self._view = view
+
+    def _term(self, index: int) -> bytes:
+        start = self._term_blob + self._term_offsets[index]
+        return self._mmap[start:self._term_blob + self._term_offsets[index + 1]]
+
+    def lookup(self, term: str) -> Optional[Tuple[memoryview, memoryview]]:
+        """The (passage ids, impacts) postings of term, best first, or None"""
+        key = term.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.term_count or self._term(low) != key:
+            return None
+        start = self._postings + self._posting_offsets[low]
+        count = (self._posting_offsets[low + 1] - self._posting_offsets[low]) // 6
+        ids = self._view[start:start + 4 * count].cast("I")
+        impacts = self._view[start + 4 * count:start + 6 * count].cast("H")
+        return ids, impacts
+
+    def passage(self, index: int) -> List[str]:
+        """[doc_id, title, text] of a passage"""
+        start = self._passage_blob + self._passage_offsets[index]
+        return json.loads(self._mmap[start:self._passage_blob + self._passage_offsets[index + 1]])
+
+    def has_doc(self, doc_hash: int) -> bool:
+        position = bisect_left(self.doc_hashes, doc_hash)
+        return position < len(self.doc_hashes) and self.doc_hashes[position] == doc_hash
+
+    def close(self):
+        for name in ("_term_offsets", "_posting_offsets", "_passage_offsets", "passage_lengths", "doc_hashes", "_view"):
+            getattr(self, name).release()
+        self._mmap.close()
+
+def _write_segment(path: str, passages: List[Tuple[str, str, str]]):
+    """Write passages ([(doc_id, title, text)]) as one segment file"""
+    lengths = array("I")
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    for passage_id, (_, title, text) in enumerate(passages):
+        tokens = tokenize(f"{title} {text}")
+        lengths.append(len(tokens))
+        for token, tf in Counter(tokens).items():
+            entries = postings.get(token)
+            if entries is None:
+                entries = postings[token] = []
+            entries.append((passage_id, tf))
+
+    average_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+    norms = [K1 * (1 - B + B * length / average_length) for length in lengths]
+    terms = sorted(postings, key=lambda term: term.encode("utf-8"))
+    term_offsets, term_blob = array("Q", [0]), bytearray()
+    posting_offsets, posting_blob = array("Q", [0]), bytearray()
+    for term in terms:
+        term_blob += term.encode("utf-8")
+        term_offsets.append(len(term_blob))
+        # Highest impact first, then passage order: sort (inverted impact, passage id) packed into one int
+        weighted = sorted(
+            (65535 - max(1, int(tf * (K1 + 1) / (tf + norms[passage_id]) * _IMPACT_SCALE + 0.5))) << 32 | passage_id
+            for passage_id, tf in postings[term]
+        )
+        posting_blob += array("I", [entry & 0xFFFFFFFF for entry in weighted]).tobytes()
+        posting_blob += array("H", [65535 - (entry >> 32) for entry in weighted]).tobytes()
+        posting_offsets.append(len(posting_blob))
+
+    passage_offsets, passage_blob = array("Q", [0]), bytearray()
+    for passage in passages:
+        passage_blob += json.dumps(list(passage), ensure_ascii=False).encode("utf-8")
+        passage_offsets.append(len(passage_blob))
+    doc_hashes = array("Q", sorted({_doc_hash(doc_id) for doc_id, _, _ in passages}))
+
+    sections = [term_offsets.tobytes(), bytes(term_blob), posting_offsets.tobytes(), bytes(posting_blob),
+                passage_offsets.tobytes(), lengths.tobytes(), bytes(passage_blob), doc_hashes.tobytes()]
+    offsets, position = [], _HEADER.size
+    for section in sections:
+        # Keep every section 8-byte aligned for the memoryview casts
+        position += -position % 8
+        offsets.append(position)
+        position += len(section)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, int(sys.byteorder == "little"), len(terms), len(passages), sum(lengths), *offsets))
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class KnowledgeIndex(SearchBackend):
+    """
+    BM25 passage search over an on-disk index directory, usable as the research agent's
+    search backend. Results carry title, snippet and url ("doc:<id>").
+
+    max_postings bounds how many of each query term's best postings are scored, which
+    keeps queries in the millisecond range regardless of corpus size.
+    """
+
+    name = "knowledge"
+
+    def __init__(self, path: str, max_postings: int = 2000, create: bool = False):
+        self.path = path
+        self.max_postings = max_postings
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._tombstones: Dict[str, int] = {}
+        self._next_sequence = 1
+        self._manifest_mtime: Optional[int] = None
+        if create:
+            os.makedirs(path, exist_ok=True)
+        elif not os.path.isdir(path):
+            raise FileNotFoundError(f"No knowledge index at {path}")
+        self.refresh()
+
+    def refresh(self):
+        """Pick up segments written since the index was opened (or last refreshed)"""
+        manifest_path = os.path.join(self.path, _MANIFEST)
+        with self._lock:
+            for attempt in range(_REFRESH_ATTEMPTS):
+                manifest: Dict[str, Any] = {"segments": [], "tombstones": {}, "next_sequence": 1}
+                mtime = None
+                if os.path.exists(manifest_path):
+                    with open(manifest_path, encoding="utf-8") as f:
+                        mtime = os.fstat(f.fileno()).st_mtime_ns
+                        manifest = json.load(f)
+                current = {segment.sequence: segment for segment in self._segments}
+                segments, opened = [], []
+                try:
+                    for entry in manifest["segments"]:
+                        segment = current.pop(entry["sequence"], None)
+                        if segment is None:
+                            segment = _Segment(os.path.join(self.path, entry["file"]), entry["sequence"])
+                            opened.append(segment)
+                        segments.append(segment)
+                    break
+                except FileNotFoundError:
+                    # Another process's optimize() removed a segment this manifest lists, so it
+                    # has already written a newer manifest
+                    for segment in opened:
+                        segment.close()
+                    if attempt == _REFRESH_ATTEMPTS - 1:
+                        raise
+            self._retire(current.values())
+            self._segments = segments
+            self._tombstones = manifest["tombstones"]
+            self._next_sequence = manifest["next_sequence"]
+            self._manifest_mtime = mtime
+
+    @property
+    def generation(self) -> int:
+        """
+        Advances with every add_documents() and optimize(); changes another writer has
+        made since the last refresh are picked up first
+        """
+        try:
+            mtime: Optional[int] = os.stat(os.path.join(self.path, _MANIFEST)).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._manifest_mtime:
+            self.refresh()
+        return self._next_sequence
+
+    @property
+    def identity(self) -> str:
+        return f"{self.name}:{os.path.abspath(self.path)}@{self.generation}"
+
+    def _write_manifest(self, segments: List[Tuple[int, str]], tombstones: Dict[str, int], next_sequence: int):
+        manifest = {
+            "segments": [{"sequence": sequence, "file": name} for sequence, name in segments],
+            "tombstones": tombstones,
+            "next_sequence": next_sequence
+        }
+        tmp_path = os.path.join(self.path, _MANIFEST + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, _MANIFEST))
+
+    def add_documents(self, documents: Iterable[Dict[str, str]], passage_words: int = PASSAGE_WORDS) -> int:
+        """
+        Index documents ({"id", "title", "text"}) as a new segment; a document whose id is
+        already indexed replaces the earlier version. Returns the number of passages added.
+        """
+        passages: List[Tuple[str, str, str]] = []
+        doc_ids = set()
+        for document in documents:
+            doc_id = str(document["id"])
+            doc_ids.add(doc_id)
+            title = document.get("title", "")
+            passages.extend((doc_id, title, text) for text in split_passages(document.get("text", ""), passage_words))
+        if not passages:
+            return 0
+
+        with self._lock:
+            sequence = self._next_sequence
+            name = f"segment-{sequence:06d}.kix"
+            _write_segment(os.path.join(self.path, name), passages)
+            tombstones = dict(self._tombstones)
+            for doc_id in doc_ids:
+                doc_hash = _doc_hash(doc_id)
+                if doc_id in tombstones or any(segment.has_doc(doc_hash) for segment in self._segments):
+                    # Passages of this document in earlier segments are superseded
+                    tombstones[doc_id] = sequence
+            segments = [(segment.sequence, os.path.basename(segment.path)) for segment in self._segments]
+            self._write_manifest(segments + [(sequence, name)], tombstones, sequence + 1)
+        self.refresh()
+        return len(passages)
+
+    def optimize(self):
+        """Merge all segments into one, dropping superseded passages and clearing tombstones"""
+        with self._lock:
+            segments = list(self._segments)
+            tombstones = self._tombstones
+            passages = [
+                tuple(segment.passage(index)) for segment in segments for index in range(segment.passage_count)
+            ]
+            live = [passage for passage, sequence in zip(
+                passages, (segment.sequence for segment in segments for _ in range(segment.passage_count))
+            ) if tombstones.get(passage[0], 0) <= sequence]
+            sequence = self._next_sequence
+            name = f"segment-{sequence:06d}.kix"
+            entries = []
+            if live:
+                _write_segment(os.path.join(self.path, name), live)
+                entries = [(sequence, name)]
+            self._write_manifest(entries, {}, sequence + 1)
+        self.refresh()
+        for segment in segments:
+            os.remove(segment.path)
+
+    def _retire(self, segments: Iterable[_Segment]):
+        """Close segments the index no longer lists once no query uses them; call with the lock held"""
+        for segment in segments:
+            segment.retired = True
+            if not segment.refs:
+                segment.close()
+
+    def _acquire(self) -> Tuple[List[_Segment], Dict[str, int]]:
+        """Snapshot the live segments and tombstones, keeping the segments open until _release()"""
+        with self._lock:
+            for segment in self._segments:
+                segment.refs += 1
+            return self._segments, self._tombstones
+
+    def _release(self, segments: List[_Segment]):
+        with self._lock:
+            for segment in segments:
+                segment.refs -= 1
+                if segment.retired and not segment.refs:
+                    segment.close()
+
+    def query(self, text: str, limit: int = 5) -> List[SearchResult]:
+        """Return the best passages for a free-text query"""
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return []
+        # Score against a snapshot so concurrent queries (and refreshes) do not wait on each other
+        segments, tombstones = self._acquire()
+        try:
+            return self._query(segments, tombstones, terms, limit) if segments else []
+        finally:
+            self._release(segments)
+
+    def _query(self, segments: List[_Segment], tombstones: Dict[str, int], terms: List[str],
+               limit: int) -> List[SearchResult]:
+        # Posting views must not outlive this call: _release() may close the segments they point into
+        passage_total = sum(segment.passage_count for segment in segments)
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = [(number, segment.lookup(term)) for number, segment in enumerate(segments)]
+            postings = [(number, found) for number, found in postings if found is not None]
+            df = sum(len(ids) for _, (ids, _) in postings)
+            if not df:
+                continue
+            idf = math.log(1 + (passage_total - df + 0.5) / (df + 0.5)) / _IMPACT_SCALE
+            for number, (ids, impacts) in postings:
+                base = number << 32
+                for passage_id, impact in zip(ids[:self.max_postings], impacts[:self.max_postings]):
+                    key = base | passage_id
+                    scores[key] = scores.get(key, 0.0) + idf * impact
+
+        results: List[SearchResult] = []
+        # Pop candidates best first until limit live ones are found; superseded passages are skipped
+        candidates = [(-score, key) for key, score in scores.items()]
+        heapq.heapify(candidates)
+        while candidates and len(results) < limit:
+            _, key = heapq.heappop(candidates)
+            segment = segments[key >> 32]
+            doc_id, title, passage_text = segment.passage(key & 0xFFFFFFFF)
+            if tombstones.get(doc_id, 0) > segment.sequence:
+                continue
+            results.append({"title": title, "snippet": passage_text, "url": f"doc:{doc_id}"})
+        return results
+
+    def search(self, queries: Sequence[str], limit: int = 5) -> List[List[SearchResult]]:
+        with instrumentation.span("search", queries=len(queries), backend=self.name):
+            return [self.query(query, limit) for query in queries]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "segments": len(self._segments),
+                "passages": sum(segment.passage_count for segment in self._segments),
+                "terms": sum(segment.term_count for segment in self._segments),
+                "tombstones": len(self._tombstones)
+            }
+
+    def close(self):
+        with self._lock:
+            self._retire(self._segments)
+            self._segments = []
+
+def read_corpus(paths: Sequence[str]) -> Iterator[Dict[str, str]]:
+    """
+    Yield documents from .jsonl files (one {"id", "title", "text"} object per line) and
+    plain-text files (one document each, id and title taken from the file name)
+    """
+    for path in paths:
+        if path.endswith(".jsonl"):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        else:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                title = os.path.splitext(os.path.basename(path))[0]
+                yield {"id": path, "title": title, "text": f.read()}
+
+def _batches(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query the offline knowledge index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="index documents from .jsonl or text files (creates the index)")
+    add.add_argument("index", help="index directory")
+    add.add_argument("files", nargs="+", help=".jsonl files of {id, title, text} objects, or text files")
+    add.add_argument("--segment-docs", type=int, default=50000, help="documents per segment")
+    optimize = commands.add_parser("optimize", help="merge segments and drop superseded passages")
+    optimize.add_argument("index")
+    query = commands.add_parser("query", help="print the best passages for a query")
+    query.add_argument("index")
+    query.add_argument("text")
+    query.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args(argv)
+    logging.basicConfig(stream=sys.stderr, format="%(message)s", level=logging.INFO)
+
+    index = KnowledgeIndex(args.index, create=args.command == "add")
+    try:
+        if args.command == "add":
+            for batch in _batches(read_corpus(args.files), args.segment_docs):
+                logger.info("Indexed %d passages from %d documents", index.add_documents(batch), len(batch))
+        elif args.command == "optimize":
+            index.optimize()
+        else:
+            for result in index.query(args.text, args.limit):
+                print(json.dumps(result, ensure_ascii=False))
+        logger.info("%s", json.dumps(index.stats()))
+    finally:
+        index.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import json
+import struct
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Tuple
+
+# Serialization of pipeline output. Records (slides, or batch results) are encoded one at
+# a time and written straight to a binary stream, so a deck or batch is never held as one
+# big document; diagnostics never go through this module and stay on stderr.
+#
+# Formats:
+#   json     a pretty-printed JSON array (indent=2), the CLI's historical output
+#   compact  a JSON array without whitespace
+#   ndjson   one compact JSON document per line
+#   msgpack  a stream of concatenated MessagePack objects (needs the msgpack package)
+#   frames   each record as a 4-byte big-endian length followed by compact JSON
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMATS: Tuple[str, ...] = ("json", "compact", "ndjson", "msgpack", "frames")
+
+_FRAME_HEADER = struct.Struct(">I")
+
+_compact_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+_pretty_encoder = json.JSONEncoder(indent=2)
+
+def dumps_compact(record: Any) -> bytes:
+    """Compact UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(record)
+    return _compact_encoder.encode(record).encode("utf-8")
+
+def _dumps_pretty_item(record: Any) -> bytes:
+    # Same bytes json.dumps(records, indent=2) gives for one array element; JSON strings
+    # cannot contain raw newlines, so re-indenting line breaks is safe
+    return ("  " + _pretty_encoder.encode(record).replace("\n", "\n  ")).encode("utf-8")
+
+def available_formats() -> Tuple[str, ...]:
+    """The formats usable in this environment"""
+    return tuple(name for name in FORMATS if name != "msgpack" or msgpack is not None)
+
+class OutputWriter:
+    """
+    Incrementally writes records to a binary stream in one of FORMATS.
+
+    Array formats (json, compact) write the opening bracket with the first record and the
+    closing one on close(); the others are self-delimiting per record. With flush=True the
+    stream is flushed after every record so readers of a pipe see each one immediately.
+    """
+
+    def __init__(self, stream: BinaryIO, format: str = "json", flush: bool = False):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown output format {format!r}; expected one of {', '.join(FORMATS)}")
+        if format == "msgpack" and msgpack is None:
+            raise ValueError("The msgpack output format needs the msgpack package")
+        self.stream = stream
+        self.format = format
+        self.flush_each = flush
+        self.count = 0
+        self.bytes_written = 0
+        self._closed = False
+        self._encode = self._encoder()
+
+    def _encoder(self) -> Callable[[Any], bytes]:
+        if self.format == "json":
+            return lambda record: (b",\n" if self.count else b"[\n") + _dumps_pretty_item(record)
+        if self.format == "compact":
+            return lambda record: (b"," if self.count else b"[") + dumps_compact(record)
+        if self.format == "ndjson":
+            return lambda record: dumps_compact(record) + b"\n"
+        if self.format == "msgpack":
+            return msgpack.Packer().pack
+        return lambda record: _frame(dumps_compact(record))
+
+    def _write(self, data: bytes):
+        self.stream.write(data)
+        self.bytes_written += len(data)
+
+    def write(self, record: Any):
+        self._write(self._encode(record))
+        self.count += 1
+        if self.flush_each:
+            self.stream.flush()
+
+    def write_all(self, records: Iterable[Any]) -> int:
+        """Write every record; returns the number written"""
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def close(self):
+        """Terminate the document (for array formats) and flush; the stream stays open"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.format == "json":
+            self._write(b"\n]\n" if self.count else b"[]\n")
+        elif self.format == "compact":
+            self._write(b"]\n" if self.count else b"[]\n")
+        self.stream.flush()
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _frame(payload: bytes) -> bytes:
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+def iter_frames(stream: BinaryIO) -> Iterator[Any]:
+    """Decode records written in the frames format"""
+    while True:
+        header = stream.read(_FRAME_HEADER.size)
+        if not header:
+            return
+        if len(header) < _FRAME_HEADER.size:
+            raise ValueError("Truncated frame header")
+        (length,) = _FRAME_HEADER.unpack(header)
+        payload = stream.read(length)
+        if len(payload) < length:
+            raise ValueError("Truncated frame payload")
+        yield orjson.loads(payload) if orjson is not None else json.loads(payload)
@@ -0,0 +1,284 @@
+import re
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Union
+from xml.sax.saxutils import escape
+
+from slide_model import Slide
+
+# Streaming OOXML (.pptx) export. The master, layouts and theme never change, so their
+# parts are pre-rendered strings written once; each slide is rendered and compressed into
+# the zip as it arrives and then dropped. Only the slide count and each slide's layout are
+# remembered, which presentation.xml, the package relationships and [Content_Types].xml
+# need and therefore are written last. Memory stays flat however long the deck is.
+
+_NS = ('xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+       'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+       'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"')
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_CT = "application/vnd.openxmlformats-officedocument"
+
+# 16:9 slide in EMU
+SLIDE_WIDTH = 12192000
+SLIDE_HEIGHT = 6858000
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+def _text(value: str) -> str:
+    return escape(_INVALID_XML.sub("", value))
+
+def _xfrm(x: int, y: int, cx: int, cy: int) -> str:
+    return f'<a:xfrm><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm>'
+
+_EMPTY_PARAGRAPH = '<a:p><a:endParaRPr lang="en-US"/></a:p>'
+
+def _placeholder(shape_id: int, name: str, ph: str, xfrm: str = "", body: str = "") -> str:
+    return (f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="{name}"/><p:cNvSpPr><a:spLocks noGrp="1"/></p:cNvSpPr>'
+            f'<p:nvPr>{ph}</p:nvPr></p:nvSpPr><p:spPr>{xfrm}</p:spPr>'
+            f'<p:txBody><a:bodyPr/><a:lstStyle/>{body or _EMPTY_PARAGRAPH}</p:txBody></p:sp>')
+
+_GROUP = '<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+
+# Placeholder geometry shared by the master and layouts
+_TITLE_BOX = _xfrm(838200, 365125, 10515600, 1325563)
+_BODY_BOX = _xfrm(838200, 1825625, 10515600, 4351338)
+_LEFT_BOX = _xfrm(838200, 1825625, 5181600, 4351338)
+_RIGHT_BOX = _xfrm(6172200, 1825625, 5181600, 4351338)
+_CENTER_TITLE_BOX = _xfrm(1524000, 1122363, 9144000, 2387600)
+_SUBTITLE_BOX = _xfrm(1524000, 3602038, 9144000, 1655762)
+
+class _Layout:
+    """A pre-rendered slide layout and how slides using it place their text"""
+
+    __slots__ = ("name", "type", "title_ph", "body_ph", "xml")
+
+    def __init__(self, name: str, type: str, title_ph: str, body_ph: str, placeholders: str):
+        self.name = name
+        self.type = type
+        self.title_ph = title_ph
+        self.body_ph = body_ph
+        self.xml = (f'{_XML_HEADER}<p:sldLayout {_NS} type="{type}" preserve="1"><p:cSld name="{name}">'
+                    f'<p:spTree>{_GROUP}{placeholders}</p:spTree></p:cSld>'
+                    '<p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sldLayout>')
+
+# Layout parts in order (slideLayout1.xml ...); slides pick one through LAYOUTS
+_LAYOUT_PARTS = (
+    _Layout("Title Slide", "title", '<p:ph type="ctrTitle"/>', '<p:ph type="subTitle" idx="1"/>',
+            _placeholder(2, "Title 1", '<p:ph type="ctrTitle"/>', _CENTER_TITLE_BOX)
+            + _placeholder(3, "Subtitle 2", '<p:ph type="subTitle" idx="1"/>', _SUBTITLE_BOX)),
+    _Layout("Title and Content", "obj", '<p:ph type="title"/>', '<p:ph idx="1"/>',
+            _placeholder(2, "Title 1", '<p:ph type="title"/>', _TITLE_BOX)
+            + _placeholder(3, "Content Placeholder 2", '<p:ph idx="1"/>', _BODY_BOX)),
+    _Layout("Two Content", "twoObj", '<p:ph type="title"/>', '<p:ph sz="half" idx="1"/>',
+            _placeholder(2, "Title 1", '<p:ph type="title"/>', _TITLE_BOX)
+            + _placeholder(3, "Content Placeholder 2", '<p:ph sz="half" idx="1"/>', _LEFT_BOX)
+            + _placeholder(4, "Content Placeholder 3", '<p:ph sz="half" idx="2"/>', _RIGHT_BOX)),
+)
+
+# Slide "layout" values to layout part numbers; anything else uses Title and Content
+LAYOUTS: Dict[str, int] = {"title": 1, "content": 2, "content_with_image": 3}
+
+_MASTER_XML = (
+    f'{_XML_HEADER}<p:sldMaster {_NS}><p:cSld><p:bg><p:bgRef idx="1001"><a:schemeClr val="bg1"/></p:bgRef></p:bg>'
+    f'<p:spTree>{_GROUP}'
+    + _placeholder(2, "Title Placeholder 1", '<p:ph type="title"/>', _TITLE_BOX)
+    + _placeholder(3, "Text Placeholder 2", '<p:ph type="body" idx="1"/>', _BODY_BOX)
+    + '</p:spTree></p:cSld>'
+    '<p:clrMap bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" accent3="accent3" '
+    'accent4="accent4" accent5="accent5" accent6="accent6" hlink="hlink" folHlink="folHlink"/>'
+    '<p:sldLayoutIdLst>'
+    + "".join(f'<p:sldLayoutId id="{2147483649 + i}" r:id="rId{i + 1}"/>' for i in range(len(_LAYOUT_PARTS)))
+    + '</p:sldLayoutIdLst><p:txStyles>'
+    '<p:titleStyle><a:lvl1pPr algn="l"><a:defRPr sz="4000" b="1"><a:solidFill><a:schemeClr val="tx2"/></a:solidFill>'
+    '<a:latin typeface="+mj-lt"/></a:defRPr></a:lvl1pPr></p:titleStyle>'
+    '<p:bodyStyle><a:lvl1pPr marL="285750" indent="-285750"><a:spcBef><a:spcPts val="1000"/></a:spcBef>'
+    '<a:buFont typeface="Arial"/><a:buChar char="&#8226;"/><a:defRPr sz="2000"><a:solidFill><a:schemeClr val="tx1"/>'
+    '</a:solidFill><a:latin typeface="+mn-lt"/></a:defRPr></a:lvl1pPr></p:bodyStyle>'
+    '<p:otherStyle><a:lvl1pPr><a:defRPr sz="1800"/></a:lvl1pPr></p:otherStyle>'
+    '</p:txStyles></p:sldMaster>'
+)
+
+_MASTER_RELS = (
+    f'{_XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    + "".join(f'<Relationship Id="rId{i + 1}" Type="{_REL}/slideLayout" Target="../slideLayouts/slideLayout{i + 1}.xml"/>'
+              for i in range(len(_LAYOUT_PARTS)))
+    + f'<Relationship Id="rId{len(_LAYOUT_PARTS) + 1}" Type="{_REL}/theme" Target="../theme/theme1.xml"/>'
+    '</Relationships>'
+)
+
+_LAYOUT_RELS = (
+    f'{_XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Type="{_REL}/slideMaster" Target="../slideMasters/slideMaster1.xml"/></Relationships>'
+)
+
+def _solid_fills(count: int) -> str:
+    return '<a:solidFill><a:schemeClr val="phClr"/></a:solidFill>' * count
+
+_THEME_XML = (
+    f'{_XML_HEADER}<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" name="Crew Theme">'
+    '<a:themeElements><a:clrScheme name="Crew">'
+    '<a:dk1><a:sysClr val="windowText" lastClr="000000"/></a:dk1><a:lt1><a:sysClr val="window" lastClr="FFFFFF"/></a:lt1>'
+    '<a:dk2><a:srgbClr val="1F2A44"/></a:dk2><a:lt2><a:srgbClr val="E7E6E6"/></a:lt2>'
+    '<a:accent1><a:srgbClr val="2F5597"/></a:accent1><a:accent2><a:srgbClr val="ED7D31"/></a:accent2>'
+    '<a:accent3><a:srgbClr val="A5A5A5"/></a:accent3><a:accent4><a:srgbClr val="FFC000"/></a:accent4>'
+    '<a:accent5><a:srgbClr val="5B9BD5"/></a:accent5><a:accent6><a:srgbClr val="70AD47"/></a:accent6>'
+    '<a:hlink><a:srgbClr val="0563C1"/></a:hlink><a:folHlink><a:srgbClr val="954F72"/></a:folHlink></a:clrScheme>'
+    '<a:fontScheme name="Crew"><a:majorFont><a:latin typeface="Calibri Light"/><a:ea typeface=""/><a:cs typeface=""/>'
+    '</a:majorFont><a:minorFont><a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/></a:minorFont>'
+    '</a:fontScheme><a:fmtScheme name="Crew">'
+    f'<a:fillStyleLst>{_solid_fills(3)}</a:fillStyleLst>'
+    '<a:lnStyleLst>'
+    + '<a:ln w="6350"><a:solidFill><a:schemeClr val="phClr"/></a:solidFill></a:ln>' * 3
+    + '</a:lnStyleLst><a:effectStyleLst>'
+    + '<a:effectStyle><a:effectLst/></a:effectStyle>' * 3
+    + f'</a:effectStyleLst><a:bgFillStyleLst>{_solid_fills(3)}</a:bgFillStyleLst>'
+    '</a:fmtScheme></a:themeElements><a:objectDefaults/><a:extraClrSchemeLst/></a:theme>'
+)
+
+_STATIC_PARTS = (
+    ("ppt/slideMasters/slideMaster1.xml", _MASTER_XML),
+    ("ppt/slideMasters/_rels/slideMaster1.xml.rels", _MASTER_RELS),
+    *((f"ppt/slideLayouts/slideLayout{i + 1}.xml", layout.xml) for i, layout in enumerate(_LAYOUT_PARTS)),
+    *((f"ppt/slideLayouts/_rels/slideLayout{i + 1}.xml.rels", _LAYOUT_RELS) for i in range(len(_LAYOUT_PARTS))),
+    ("ppt/theme/theme1.xml", _THEME_XML),
+    ("ppt/presProps.xml", f'{_XML_HEADER}<p:presentationPr {_NS}/>'),
+    ("ppt/viewProps.xml", f'{_XML_HEADER}<p:viewPr {_NS}><p:gridSpacing cx="76200" cy="76200"/></p:viewPr>'),
+    ("ppt/tableStyles.xml", f'{_XML_HEADER}<a:tblStyleLst xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+                            'def="{5C22544A-7EE6-4342-B048-85BDC9FD1C3A}"/>'),
+    ("_rels/.rels",
+     f'{_XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="ppt/presentation.xml"/>'
+     '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+     'Target="docProps/core.xml"/>'
+     '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" '
+     'Target="docProps/app.xml"/></Relationships>'),
+)
+
+_SLIDE_RELS = [
+    (f'{_XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     f'<Relationship Id="rId1" Type="{_REL}/slideLayout" Target="../slideLayouts/slideLayout{i + 1}.xml"/></Relationships>')
+    .encode("utf-8")
+    for i in range(len(_LAYOUT_PARTS))
+]
+
+def _paragraphs(lines: Iterable[str]) -> str:
+    return "".join(f'<a:p><a:r><a:rPr lang="en-US" dirty="0"/><a:t>{_text(line)}</a:t></a:r></a:p>' for line in lines)
+
+class PptxWriter:
+    """
+    Writes slides into a .pptx at target (a path or a writable binary stream) one at a
+    time. The package is complete once close() has run; streams need not be seekable.
+    """
+
+    def __init__(self, target: Union[str, BinaryIO], title: str = "", author: str = "CrewAI PPT Generator",
+                 compresslevel: Optional[int] = None):
+        self._zip = zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self.title = title
+        self.author = author
+        self._layouts: List[int] = []
+        self._closed = False
+        for name, xml in _STATIC_PARTS:
+            self._zip.writestr(name, xml)
+
+    def __len__(self) -> int:
+        return len(self._layouts)
+
+    def add_slide(self, slide: Union[Slide, Dict[str, Any]]):
+        if not isinstance(slide, Slide):
+            slide = Slide.from_dict(slide)
+        layout_number = LAYOUTS.get(slide.layout, LAYOUTS["content"])
+        layout = _LAYOUT_PARTS[layout_number - 1]
+        number = len(self._layouts) + 1
+
+        if layout.type == "title":
+            body_lines = [slide.subtitle] if slide.subtitle else list(slide.content[:1])
+        else:
+            body_lines = slide.content
+        with self._zip.open(f"ppt/slides/slide{number}.xml", "w") as part:
+            part.write(f'{_XML_HEADER}<p:sld {_NS}><p:cSld><p:spTree>{_GROUP}'.encode("utf-8"))
+            part.write(_placeholder(2, "Title 1", layout.title_ph, body=_paragraphs([slide.title])).encode("utf-8"))
+            if body_lines:
+                part.write(_placeholder(3, "Content 2", layout.body_ph, body=_paragraphs(body_lines)).encode("utf-8"))
+            part.write(b'</p:spTree></p:cSld><p:clrMapOvr><a:masterClrMapping/></p:clrMapOvr></p:sld>')
+        self._zip.writestr(f"ppt/slides/_rels/slide{number}.xml.rels", _SLIDE_RELS[layout_number - 1])
+        self._layouts.append(layout_number)
+
+    def add_slides(self, slides: Iterable[Union[Slide, Dict[str, Any]]]) -> int:
+        for slide in slides:
+            self.add_slide(slide)
+        return len(self._layouts)
+
+    def close(self):
+        """Write the parts that depend on the slide count, then finish the zip"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            count = len(self._layouts)
+            first_slide_rel = 5
+            self._zip.writestr("ppt/_rels/presentation.xml.rels", "".join([
+                f'{_XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">',
+                f'<Relationship Id="rId1" Type="{_REL}/slideMaster" Target="slideMasters/slideMaster1.xml"/>',
+                f'<Relationship Id="rId2" Type="{_REL}/presProps" Target="presProps.xml"/>',
+                f'<Relationship Id="rId3" Type="{_REL}/viewProps" Target="viewProps.xml"/>',
+                f'<Relationship Id="rId4" Type="{_REL}/tableStyles" Target="tableStyles.xml"/>',
+                *(f'<Relationship Id="rId{first_slide_rel + i}" Type="{_REL}/slide" Target="slides/slide{i + 1}.xml"/>'
+                  for i in range(count)),
+                '</Relationships>'
+            ]))
+            slide_ids = "".join(f'<p:sldId id="{256 + i}" r:id="rId{first_slide_rel + i}"/>' for i in range(count))
+            self._zip.writestr("ppt/presentation.xml", "".join([
+                f'{_XML_HEADER}<p:presentation {_NS} saveSubsetFonts="1">',
+                '<p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>',
+                f'<p:sldIdLst>{slide_ids}</p:sldIdLst>' if count else "",
+                f'<p:sldSz cx="{SLIDE_WIDTH}" cy="{SLIDE_HEIGHT}"/><p:notesSz cx="6858000" cy="9144000"/>',
+                '</p:presentation>'
+            ]))
+            created = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self._zip.writestr("docProps/core.xml", (
+                f'{_XML_HEADER}<cp:coreProperties '
+                'xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+                'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+                'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+                f'<dc:title>{_text(self.title)}</dc:title><dc:creator>{_text(self.author)}</dc:creator>'
+                f'<dcterms:created xsi:type="dcterms:W3CDTF">{created}</dcterms:created></cp:coreProperties>'
+            ))
+            self._zip.writestr("docProps/app.xml", (
+                f'{_XML_HEADER}<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+                f'<Application>CrewAI PPT Generator</Application><Slides>{count}</Slides></Properties>'
+            ))
+            self._zip.writestr("[Content_Types].xml", "".join([
+                f'{_XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">',
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>',
+                '<Default Extension="xml" ContentType="application/xml"/>',
+                f'<Override PartName="/ppt/presentation.xml" ContentType="{_CT}.presentationml.presentation.main+xml"/>',
+                f'<Override PartName="/ppt/slideMasters/slideMaster1.xml" ContentType="{_CT}.presentationml.slideMaster+xml"/>',
+                *(f'<Override PartName="/ppt/slideLayouts/slideLayout{i + 1}.xml" '
+                  f'ContentType="{_CT}.presentationml.slideLayout+xml"/>' for i in range(len(_LAYOUT_PARTS))),
+                *(f'<Override PartName="/ppt/slides/slide{i + 1}.xml" ContentType="{_CT}.presentationml.slide+xml"/>'
+                  for i in range(count)),
+                f'<Override PartName="/ppt/theme/theme1.xml" ContentType="{_CT}.theme+xml"/>',
+                f'<Override PartName="/ppt/presProps.xml" ContentType="{_CT}.presentationml.presProps+xml"/>',
+                f'<Override PartName="/ppt/viewProps.xml" ContentType="{_CT}.presentationml.viewProps+xml"/>',
+                f'<Override PartName="/ppt/tableStyles.xml" ContentType="{_CT}.presentationml.tableStyles+xml"/>',
+                '<Override PartName="/docProps/core.xml" ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>',
+                f'<Override PartName="/docProps/app.xml" ContentType="{_CT}.extended-properties+xml"/>',
+                '</Types>'
+            ]))
+        finally:
+            self._zip.close()
+
+    def __enter__(self) -> "PptxWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def export_pptx(slides: Iterable[Union[Slide, Dict[str, Any]]], target: Union[str, BinaryIO], title: str = "") -> int:
+    """Write slides (e.g. PPTGeneratorCrew.iter_slides()) to a .pptx; returns the slide count"""
+    with PptxWriter(target, title=title) as writer:
+        return writer.add_slides(slides)
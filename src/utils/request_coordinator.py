@@ -0,0 +1,289 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from instrumentation import instrumentation, logger
+from result_cache import normalized_key
+
+# Front end for deck generation under bursty load. Identical in-flight requests share one
+# computation (singleflight); distinct ones wait in a bounded priority queue served by a
+# fixed set of worker threads. A request whose deadline cannot be met is turned away at
+# admission or shed when it reaches the head of the queue, and a full queue sheds its
+# least important entry rather than growing, so tail latency stays bounded.
+
+class Overloaded(Exception):
+    """The queue is full and the request was not important enough to displace another"""
+
+class DeadlineExceeded(Exception):
+    """The request cannot finish, or did not finish, before its deadline"""
+
+# Weight of the newest sample in the service-time estimate
+_EWMA_ALPHA = 0.2
+
+_QUEUED, _RUNNING, _DONE = "queued", "running", "done"
+
+class _Flight:
+    """One computation and the tickets waiting on it"""
+
+    __slots__ = ("key", "function", "args", "priority", "deadline", "state", "tickets")
+
+    def __init__(self, key: str, function: Callable[..., Any], args: Tuple, priority: int,
+                 deadline: Optional[float]):
+        self.key = key
+        self.function = function
+        self.args = args
+        self.priority = priority
+        self.deadline = deadline
+        self.state = _QUEUED
+        self.tickets: Set["Ticket"] = set()
+
+class Ticket:
+    """A caller's handle on a submitted request; several tickets may share one flight"""
+
+    __slots__ = ("_coordinator", "_flight", "future", "deadline", "coalesced", "__weakref__")
+
+    def __init__(self, coordinator: "GenerationCoordinator", flight: _Flight, deadline: Optional[float],
+                 coalesced: bool):
+        self._coordinator = coordinator
+        self._flight = flight
+        self.future: Future = Future()
+        self.deadline = deadline
+        self.coalesced = coalesced
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the result. Waiting stops at the ticket's deadline (raising
+        DeadlineExceeded and cancelling the ticket) or after timeout seconds.
+        """
+        wait = timeout
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.monotonic())
+            wait = remaining if wait is None else min(wait, remaining)
+        try:
+            return self.future.result(wait)
+        except FutureTimeoutError:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.cancel()
+                raise DeadlineExceeded("Request did not finish before its deadline") from None
+            raise
+
+    def cancel(self) -> bool:
+        """Stop waiting; the computation is dropped too if no other ticket still needs it"""
+        if self.future.done():
+            return self.future.cancelled()
+        if not self.future.cancel():
+            return False
+        self._coordinator._release(self)
+        return True
+
+    def done(self) -> bool:
+        return self.future.done()
+
+class GenerationCoordinator:
+    """
+    Runs compute(topic, requirements, num_slides) for concurrent callers.
+
+    max_workers threads serve the queue, which holds at most max_queue distinct pending
+    requests. Lower priority values are served first. timeout is the default per-request
+    deadline in seconds (None waits indefinitely).
+    """
+
+    def __init__(self, compute: Callable[[str, str, Optional[int]], Any], max_workers: int = 4,
+                 max_queue: int = 64, timeout: Optional[float] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must not be negative")
+        self.compute = compute
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._work_ready = threading.Condition(self._lock)
+        self._flights: Dict[str, _Flight] = {}
+        self._heap: List[Tuple[int, int, _Flight]] = []
+        self._sequence = itertools.count()
+        self._queued = 0
+        self._running = 0
+        self._closed = False
+        # Smoothed seconds per computation, used to turn away requests that cannot make it
+        self.service_time: Optional[float] = None
+        self.stats: Dict[str, int] = {
+            "submitted": 0, "coalesced": 0, "completed": 0, "failed": 0,
+            "rejected": 0, "shed": 0, "expired": 0, "cancelled": 0
+        }
+        self._workers = [threading.Thread(target=self._work, name=f"coordinator-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    @staticmethod
+    def make_key(topic: str, requirements: str = "", num_slides: Optional[int] = None) -> str:
+        """Requests differing only in whitespace share a flight"""
+        return normalized_key(topic, requirements or "", num_slides)
+
+    def submit(self, topic: str, requirements: str = "", num_slides: Optional[int] = None,
+               priority: int = 0, timeout: Optional[float] = None) -> Ticket:
+        """
+        Queue a request, or join an identical one already in flight. Raises Overloaded
+        when the queue is full of more important work and DeadlineExceeded when the
+        estimated wait already exceeds the deadline.
+        """
+        return self.submit_call(self.make_key(topic, requirements, num_slides), self.compute,
+                                (topic, requirements, num_slides), priority, timeout)
+
+    def submit_call(self, key: str, function: Callable[..., Any], args: Tuple = (),
+                    priority: int = 0, timeout: Optional[float] = None) -> Ticket:
+        """
+        submit for other work sharing the workers and admission control: runs
+        function(*args), coalescing calls with the same key
+        """
+        timeout = self.timeout if timeout is None else timeout
+        now = time.monotonic()
+        deadline = now + timeout if timeout is not None else None
+        shed: Optional[_Flight] = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Coordinator is closed")
+            self.stats["submitted"] += 1
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.stats["coalesced"] += 1
+                instrumentation.count("requests_coalesced")
+                ticket = Ticket(self, flight, deadline, coalesced=True)
+                flight.tickets.add(ticket)
+                # The shared flight serves its most urgent waiter and lives as long as its most patient one
+                flight.deadline = None if deadline is None or flight.deadline is None else max(flight.deadline, deadline)
+                if priority < flight.priority and flight.state == _QUEUED:
+                    flight.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._sequence), flight))
+                return ticket
+
+            if deadline is not None and self.service_time is not None:
+                rounds = self._queued // self.max_workers + (1 if self._running >= self.max_workers else 0) + 1
+                if now + rounds * self.service_time > deadline:
+                    self.stats["rejected"] += 1
+                    instrumentation.count("requests_rejected")
+                    raise DeadlineExceeded("Request cannot finish before its deadline at the current load")
+
+            if self._queued >= self.max_queue:
+                shed = self._least_important()
+                if shed is None or shed.priority <= priority:
+                    self.stats["rejected"] += 1
+                    instrumentation.count("requests_rejected")
+                    raise Overloaded("Generation queue is full")
+                self._drop(shed)
+                self.stats["shed"] += 1
+                instrumentation.count("requests_shed")
+
+            flight = _Flight(key, function, args, priority, deadline)
+            ticket = Ticket(self, flight, deadline, coalesced=False)
+            flight.tickets.add(ticket)
+            self._flights[key] = flight
+            self._queued += 1
+            heapq.heappush(self._heap, (priority, next(self._sequence), flight))
+            self._work_ready.notify()
+        if shed is not None:
+            self._settle(shed, error=Overloaded("Shed from a full generation queue"))
+        return ticket
+
+    def generate(self, topic: str, requirements: str = "", num_slides: Optional[int] = None,
+                 priority: int = 0, timeout: Optional[float] = None) -> Any:
+        """Submit and wait for the result"""
+        return self.submit(topic, requirements, num_slides, priority, timeout).result()
+
+    def _least_important(self) -> Optional[_Flight]:
+        queued = [flight for flight in self._flights.values() if flight.state == _QUEUED]
+        return max(queued, key=lambda flight: flight.priority, default=None)
+
+    def _drop(self, flight: _Flight):
+        """Forget a queued flight (lock held); its stale heap entries are skipped by workers"""
+        flight.state = _DONE
+        self._queued -= 1
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    def _release(self, ticket: Ticket):
+        flight = ticket._flight
+        with self._lock:
+            self.stats["cancelled"] += 1
+            flight.tickets.discard(ticket)
+            if not flight.tickets and flight.state == _QUEUED:
+                self._drop(flight)
+
+    def _settle(self, flight: _Flight, result: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            tickets = list(flight.tickets)
+            flight.tickets.clear()
+        for ticket in tickets:
+            try:
+                if error is not None:
+                    ticket.future.set_exception(error)
+                else:
+                    ticket.future.set_result(result)
+            except InvalidStateError:
+                # Cancelled between the snapshot and now
+                pass
+
+    def _next_flight(self) -> Optional[_Flight]:
+        """Block until a flight is ready to run; None once closed and drained"""
+        while True:
+            with self._lock:
+                while not self._heap and not self._closed:
+                    self._work_ready.wait()
+                if not self._heap:
+                    return None
+                priority, _, flight = heapq.heappop(self._heap)
+                # Skip entries superseded by a priority bump, or for dropped flights
+                if flight.state != _QUEUED or priority != flight.priority:
+                    continue
+                if flight.deadline is None or time.monotonic() < flight.deadline:
+                    self._queued -= 1
+                    flight.state = _RUNNING
+                    self._running += 1
+                    return flight
+                self._drop(flight)
+                self.stats["expired"] += 1
+                instrumentation.count("requests_expired")
+            self._settle(flight, error=DeadlineExceeded("Request expired in the queue"))
+
+    def _work(self):
+        while True:
+            flight = self._next_flight()
+            if flight is None:
+                return
+            started = time.monotonic()
+            try:
+                result = flight.function(*flight.args)
+                error = None
+            except Exception as exc:
+                logger.warning("Generation failed for %s: %s", flight.key, exc)
+                result, error = None, exc
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._running -= 1
+                flight.state = _DONE
+                if self._flights.get(flight.key) is flight:
+                    del self._flights[flight.key]
+                self.stats["failed" if error else "completed"] += 1
+                self.service_time = elapsed if self.service_time is None else \
+                    (1 - _EWMA_ALPHA) * self.service_time + _EWMA_ALPHA * elapsed
+            self._settle(flight, result, error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats, queued=self._queued, running=self._running,
+                        service_time=self.service_time, max_queue=self.max_queue, workers=self.max_workers)
+
+    def close(self, wait: bool = True):
+        """Stop accepting work; queued requests still run unless they are cancelled"""
+        with self._lock:
+            self._closed = True
+            self._work_ready.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
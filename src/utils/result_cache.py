@@ -0,0 +1,166 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Agent outputs are cached as JSON text: it keeps entries compact, gives every reader
+# its own copy to mutate, and is the same representation the on-disk store uses.
+
+def normalized_key(*parts: Any) -> str:
+    """JSON key of parts with whitespace runs in strings collapsed, so inputs differing only in spacing share it"""
+    return json.dumps([" ".join(part.split()) if isinstance(part, str) else part for part in parts])
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+class ResultCache:
+    """
+    Cache for agent outputs keyed on a normalized (stage, topic, requirements) triple.
+
+    Entries live in an in-memory LRU bounded by max_entries and expire after ttl seconds
+    (None disables expiry). With a path, entries are also written to a SQLite file so they
+    survive restarts and can be shared by worker processes.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None, path: Optional[str] = None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS agent_results (key TEXT PRIMARY KEY, created REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            if ttl is not None:
+                self._db.execute("DELETE FROM agent_results WHERE created < ?", (time.time() - ttl,))
+
+    @staticmethod
+    def make_key(stage: str, topic: str, requirements: str = "", source: Optional[str] = None) -> str:
+        """
+        Build a cache key; whitespace differences in the inputs map to the same entry.
+        source identifies where a stage's inputs came from (such as a search backend), if
+        anywhere beyond the topic and requirements.
+        """
+        if source is None:
+            return normalized_key(stage, topic, requirements or "")
+        return normalized_key(stage, topic, requirements or "", source)
+
+    def _expired(self, created: float, now: float) -> bool:
+        return self.ttl is not None and now - created > self.ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh copy of the cached value, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    del self._entries[key]
+                    self.stats.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return json.loads(entry[1])
+
+            if self._db is not None:
+                row = self._db.execute("SELECT created, value FROM agent_results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if self._expired(row[0], now):
+                        self._db.execute("DELETE FROM agent_results WHERE key = ?", (key,))
+                        self.stats.expirations += 1
+                    else:
+                        self._store(key, row[0], row[1])
+                        self.stats.hits += 1
+                        self.stats.disk_hits += 1
+                        return json.loads(row[1])
+
+            self.stats.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        encoded = json.dumps(value)
+        created = time.time()
+        with self._lock:
+            self._store(key, created, encoded)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO agent_results (key, created, value) VALUES (?, ?, ?)",
+                    (key, created, encoded)
+                )
+
+    def update(self, key: str, values: Dict[str, Any]):
+        """
+        Merge values into the dict cached at key. The entry keeps the creation time of its
+        oldest values, so adding fields never extends how long earlier ones live.
+        """
+        now = time.time()
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None and self._db is not None:
+                current = self._db.execute("SELECT created, value FROM agent_results WHERE key = ?", (key,)).fetchone()
+            if current is not None and not self._expired(current[0], now):
+                created, merged = current[0], {**json.loads(current[1]), **values}
+            else:
+                created, merged = now, values
+            encoded = json.dumps(merged)
+            self._store(key, created, encoded)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO agent_results (key, created, value) VALUES (?, ?, ?)",
+                    (key, created, encoded)
+                )
+
+    def _store(self, key: str, created: float, encoded: str):
+        self._entries[key] = (created, encoded)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM agent_results")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,418 @@
+import asyncio
+import json
+import re
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from instrumentation import instrumentation, logger
+
+# Search tools for the Research Specialist. A topic and its requirements are split into
+# several sub-queries that run concurrently; the HTTP backend keeps pooled keep-alive
+# connections on a background event loop, bounded per host, with timeouts and retries.
+
+SearchResult = Dict[str, str]
+
+class SearchError(Exception):
+    pass
+
+class SearchBackend:
+    """Interface for research search tools"""
+
+    name = "search"
+
+    @property
+    def identity(self) -> str:
+        """What the backend searches; research cached from one source is not served for another"""
+        return self.name
+
+    def search(self, queries: Sequence[str], limit: int = 5) -> List[List[SearchResult]]:
+        """Run queries concurrently, returning one result list per query in query order"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+class _HostPool:
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+class AsyncHTTPClient:
+    """
+    Minimal HTTP/1.1 GET client with per-host connection pooling.
+
+    At most max_per_host requests run against one host at a time; idle keep-alive
+    connections are reused. Connection errors, timeouts, 429 and 5xx responses are
+    retried with exponential backoff.
+    """
+
+    def __init__(self, max_per_host: int = 8, timeout: float = 5.0, retries: int = 2, backoff: float = 0.1):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = {}
+
+    def _pool(self, key: Tuple[str, str, int]) -> _HostPool:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(self.max_per_host)
+        return pool
+
+    async def get_json(self, url: str) -> Any:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise SearchError(f"Unsupported URL scheme in {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        pool = self._pool((parts.scheme, parts.hostname, port))
+
+        attempt = 0
+        while True:
+            try:
+                async with pool.semaphore:
+                    status, body = await asyncio.wait_for(self._request(pool, parts, port), self.timeout)
+                if status == 429 or status >= 500:
+                    raise _RetryableStatus(status)
+                if status != 200:
+                    raise SearchError(f"HTTP {status} from {url}")
+                try:
+                    return json.loads(body)
+                except ValueError as exc:
+                    raise SearchError(f"Invalid JSON from {url}") from exc
+            except (OSError, EOFError, asyncio.TimeoutError, _RetryableStatus) as exc:
+                if attempt >= self.retries:
+                    raise SearchError(f"{url} failed after {attempt + 1} attempts: {exc!r}") from exc
+                instrumentation.count("search_retries")
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+                attempt += 1
+
+    async def _request(self, pool: _HostPool, parts, port: int) -> Tuple[int, bytes]:
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = (f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\nAccept: application/json\r\n"
+                   f"Connection: keep-alive\r\n\r\n").encode("latin-1")
+
+        while pool.idle:
+            reader, writer = pool.idle.pop()
+            if writer.is_closing():
+                continue
+            try:
+                return await self._exchange(pool, reader, writer, request)
+            except (ConnectionError, EOFError):
+                # The server closed an idle keep-alive connection; retry on a fresh one
+                continue
+
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=ssl.create_default_context() if parts.scheme == "https" else None
+        )
+        return await self._exchange(pool, reader, writer, request)
+
+    async def _exchange(self, pool: _HostPool, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                        request: bytes) -> Tuple[int, bytes]:
+        try:
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connection closed before response")
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise SearchError(f"Malformed HTTP status line {status_line[:80]!r}") from None
+
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            keep_alive = headers.get("connection", "").lower() != "close"
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = await self._read_chunked(reader)
+            elif "content-length" in headers:
+                try:
+                    length = int(headers["content-length"])
+                except ValueError:
+                    raise SearchError(f"Malformed Content-Length {headers['content-length']!r}") from None
+                body = await reader.readexactly(length)
+            else:
+                body = await reader.read()
+                keep_alive = False
+        except BaseException:
+            writer.close()
+            raise
+
+        if keep_alive:
+            pool.idle.append((reader, writer))
+        else:
+            writer.close()
+        return status, body
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        chunks = []
+        while True:
+            line = await reader.readline()
+            try:
+                size = int(line.split(b";")[0].strip(), 16)
+            except ValueError:
+                raise SearchError(f"Malformed chunk size {line[:80]!r}") from None
+            if size == 0:
+                # Skip trailers up to the blank line ending the message
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    async def close(self):
+        for pool in self._pools.values():
+            while pool.idle:
+                _, writer = pool.idle.pop()
+                writer.close()
+        self._pools.clear()
+
+class HTTPSearchBackend(SearchBackend):
+    """
+    Search backend for a JSON endpoint answering GET <endpoint>?q=...&limit=... with
+    {"results": [{"title": ..., "snippet": ..., "url": ...}, ...]}.
+
+    Requests run on a background event loop owned by the backend, so pooled connections
+    survive between calls and the backend can be shared by threads. A query that still
+    fails after retries yields no results instead of failing the research step.
+    """
+
+    name = "http"
+
+    def __init__(self, endpoint: str, max_per_host: int = 8, timeout: float = 5.0, retries: int = 2,
+                 backoff: float = 0.1):
+        self.endpoint = endpoint
+        self._client_options = {"max_per_host": max_per_host, "timeout": timeout, "retries": retries, "backoff": backoff}
+        self._client: Optional[AsyncHTTPClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def identity(self) -> str:
+        return f"{self.name}:{self.endpoint}"
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._client = AsyncHTTPClient(**self._client_options)
+                self._thread = threading.Thread(target=self._loop.run_forever, name="search-backend", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def search(self, queries: Sequence[str], limit: int = 5) -> List[List[SearchResult]]:
+        if not queries:
+            return []
+        loop = self._ensure_loop()
+        with instrumentation.span("search", queries=len(queries)):
+            return asyncio.run_coroutine_threadsafe(self.search_async(queries, limit), loop).result()
+
+    async def search_async(self, queries: Sequence[str], limit: int = 5) -> List[List[SearchResult]]:
+        return list(await asyncio.gather(*(self._search_one(query, limit) for query in queries)))
+
+    async def _search_one(self, query: str, limit: int) -> List[SearchResult]:
+        url = f"{self.endpoint}?{urlencode({'q': query, 'limit': limit})}"
+        try:
+            data = await self._client.get_json(url)
+            results = data.get("results", []) if isinstance(data, dict) else None
+            if not isinstance(results, list):
+                raise SearchError(f"Expected a {{\"results\": [...]}} object from {self.endpoint}")
+        except SearchError as exc:
+            logger.warning("Search for %r failed: %s", query, exc)
+            instrumentation.count("search_failures")
+            return []
+        # Entries that are not result objects are skipped rather than failing the research step
+        return [result for result in results if isinstance(result, dict)][:limit]
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+            if loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            loop.close()
+            self._thread = None
+            self._client = None
+
+# Sub-queries per research field; requirement_analysis gets one query per listed requirement
+SEARCH_QUERIES = {
+    "overview": "{topic} overview",
+    "current_trends": "{topic} latest trends",
+    "challenges": "{topic} challenges and barriers",
+    "opportunities": "{topic} opportunities"
+}
+
+# market_data is a dict of findings; each entry gets its own sub-query
+MARKET_DATA_QUERIES = {
+    "size": "{topic} market size",
+    "growth_rate": "{topic} market growth rate",
+    "key_players": "{topic} key players",
+    "regional_insights": "{topic} adoption by region"
+}
+
+MARKET_DATA_KEYS = tuple(MARKET_DATA_QUERIES)
+
+def split_requirements(requirements: str) -> List[str]:
+    """Split a free-text requirements string into separate focus areas"""
+    parts = re.split(r"[,;\n]|\band\b", requirements or "")
+    return [part.strip() for part in parts if part.strip()]
+
+def plan_queries(topic: str, requirements: str, fields: Sequence[str]) -> List[Tuple[str, Optional[str], str]]:
+    """Return (field, key, query) triples covering the searchable fields; key names the market_data entry, else None"""
+    queries: List[Tuple[str, Optional[str], str]] = []
+    for field in fields:
+        if field in SEARCH_QUERIES:
+            queries.append((field, None, SEARCH_QUERIES[field].format(topic=topic)))
+        elif field == "market_data":
+            queries.extend((field, key, query.format(topic=topic)) for key, query in MARKET_DATA_QUERIES.items())
+        elif field == "requirement_analysis":
+            queries.extend((field, None, f"{topic} {focus}") for focus in split_requirements(requirements))
+    return queries
+
+def enrich_research(backend: SearchBackend, topic: str, requirements: str, findings: Dict[str, Any],
+                    limit: int = 4) -> Dict[str, Any]:
+    """
+    Replace templated research findings with search results where the backend found any.
+    All sub-queries are issued in one concurrent batch.
+    """
+    queries = plan_queries(topic, requirements, list(findings))
+    if not queries:
+        return findings
+    results = backend.search([query for _, _, query in queries], limit)
+
+    snippets: Dict[str, List[str]] = {}
+    market_data: Dict[str, str] = {}
+    for (field, key, _), hits in zip(queries, results):
+        found = [hit["snippet"] for hit in hits if isinstance(hit.get("snippet"), str) and hit["snippet"]]
+        if key is not None:
+            # Each market_data entry takes the best result of its own query
+            if found:
+                market_data[key] = found[0]
+        elif field == "requirement_analysis":
+            # One finding per focus area keeps every requirement represented
+            snippets.setdefault(field, []).extend(found[:1])
+        else:
+            snippets.setdefault(field, []).extend(found)
+
+    for field, found in snippets.items():
+        if not found:
+            continue
+        if field == "overview":
+            findings[field] = found[0]
+        else:
+            findings[field] = found[:limit]
+    if market_data:
+        findings["market_data"] = {**findings["market_data"], **market_data}
+    return findings
+
+class _FakeSearchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        fake: "FakeSearchServer" = self.server.fake
+        number = fake._next_request()
+        if fake.fail_every and number % fake.fail_every == 0:
+            self._send(503, b"")
+            return
+        if fake.latency:
+            time.sleep(fake.latency)
+
+        parts = urlsplit(self.path)
+        if parts.path != "/search":
+            self._send(404, b"")
+            return
+        params = parse_qs(parts.query)
+        query = params.get("q", [""])[0]
+        limit = int(params.get("limit", ["5"])[0])
+        body = json.dumps({"query": query, "results": fake.results_for(query, limit)}).encode("utf-8")
+        self._send(200, body)
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeSearchServer:
+    """
+    In-process stand-in for a search API, for offline development and tests. Results are
+    deterministic per query; latency and fail_every (every Nth request answers 503)
+    exercise the client's concurrency limits and retries.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _FakeSearchHandler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def _next_request(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def results_for(self, query: str, limit: int) -> List[SearchResult]:
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return [
+            {
+                "title": f"{query} — source {rank}",
+                "snippet": f"Source {rank} reports on {query}",
+                "url": f"https://search.example/{slug}/{rank}"
+            }
+            for rank in range(1, limit + 1)
+        ]
+
+    def start(self) -> "FakeSearchServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-search", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeSearchServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
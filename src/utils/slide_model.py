@@ -0,0 +1,166 @@
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# Slides are held as __slots__ objects rather than dicts: batch exports keep hundreds of
+# thousands of decks in memory, where per-slide dicts and duplicated strings dominate RSS.
+# Short labels (slide types, layouts, agent sources, designer notes) are interned and
+# bullet lists are stored as tuples so constant content can be shared between decks.
+
+_KNOWN_KEYS = (
+    "id", "title", "subtitle", "content", "slideType", "layout", "images",
+    "agent_source", "design_notes", "visual_elements"
+)
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Slide:
+    """
+    One slide of a deck. Optional fields (subtitle, agent_source, design_notes,
+    visual_elements) are None when the slide does not carry them, and are left out
+    of to_dict(). Keys this model does not know about are kept in extra.
+    """
+
+    __slots__ = _KNOWN_KEYS + ("extra",)
+
+    def __init__(self, id: int, title: str, content: Sequence[str] = (), slideType: str = "content",
+                 layout: str = "content", images: Sequence[str] = (), subtitle: Optional[str] = None,
+                 agent_source: Optional[str] = None, design_notes: Optional[str] = None,
+                 visual_elements: Optional[str] = None, extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.title = title
+        self.subtitle = subtitle
+        self.content = tuple(content)
+        self.slideType = sys.intern(slideType)
+        self.layout = sys.intern(layout)
+        self.images = tuple(images)
+        self.agent_source = _intern(agent_source)
+        self.design_notes = _intern(design_notes)
+        self.visual_elements = _intern(visual_elements)
+        self.extra = extra or None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the slide in the JSON shape the pipeline has always produced"""
+        data: Dict[str, Any] = {"id": self.id, "title": self.title}
+        if self.subtitle is not None:
+            data["subtitle"] = self.subtitle
+        data["content"] = list(self.content)
+        data["slideType"] = self.slideType
+        data["layout"] = self.layout
+        data["images"] = list(self.images)
+        if self.agent_source is not None:
+            data["agent_source"] = self.agent_source
+        if self.design_notes is not None:
+            data["design_notes"] = self.design_notes
+        if self.visual_elements is not None:
+            data["visual_elements"] = self.visual_elements
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Slide":
+        extra = {key: value for key, value in data.items() if key not in _KNOWN_KEYS}
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            subtitle=data.get("subtitle"),
+            content=data.get("content", ()),
+            slideType=data.get("slideType", "content"),
+            layout=data.get("layout", "content"),
+            images=data.get("images", ()),
+            agent_source=data.get("agent_source"),
+            design_notes=data.get("design_notes"),
+            visual_elements=data.get("visual_elements"),
+            extra=extra
+        )
+
+    def copy(self) -> "Slide":
+        clone = Slide.__new__(Slide)
+        for name in self.__slots__:
+            object.__setattr__(clone, name, getattr(self, name))
+        if clone.extra:
+            clone.extra = dict(clone.extra)
+        return clone
+
+    def same_content(self, other: "Slide") -> bool:
+        """Compare two slides ignoring their position (id) in the deck"""
+        return self.__getstate__()[1:] == other.__getstate__()[1:]
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+        # Unpickling does not intern strings; restore the sharing of labels
+        for name in ("slideType", "layout", "agent_source", "design_notes", "visual_elements"):
+            object.__setattr__(self, name, _intern(getattr(self, name)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Slide):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return f"Slide(id={self.id!r}, title={self.title!r}, slideType={self.slideType!r})"
+
+class Deck:
+    """
+    An ordered list of slides together with the inputs that produced them. plan holds the
+    slide-plan key of each slide and num_slides the requested budget, when known; they let
+    a later regeneration reuse the slides its changed inputs do not affect.
+    """
+
+    __slots__ = ("topic", "requirements", "slides", "plan", "num_slides")
+
+    def __init__(self, topic: str, requirements: str = "", slides: Optional[Iterable[Slide]] = None,
+                 plan: Optional[Sequence[str]] = None, num_slides: Optional[int] = None):
+        self.topic = topic
+        self.requirements = requirements
+        self.slides: List[Slide] = list(slides) if slides is not None else []
+        self.plan = tuple(plan) if plan is not None else None
+        self.num_slides = num_slides
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Return the slides as the list of dicts generate_presentation returns"""
+        return [slide.to_dict() for slide in self.slides]
+
+    @classmethod
+    def from_list(cls, items: Iterable[Dict[str, Any]], topic: str = "", requirements: str = "") -> "Deck":
+        return cls(topic, requirements, (Slide.from_dict(item) for item in items))
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"topic": self.topic, "requirements": self.requirements, "slides": self.to_list()}
+        if self.plan is not None:
+            data["plan"] = list(self.plan)
+        if self.num_slides is not None:
+            data["num_slides"] = self.num_slides
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Deck":
+        deck = cls.from_list(data.get("slides", []), data.get("topic", ""), data.get("requirements", ""))
+        deck.plan = tuple(data["plan"]) if data.get("plan") is not None else None
+        deck.num_slides = data.get("num_slides")
+        return deck
+
+    def __getstate__(self):
+        return (self.topic, self.requirements, self.slides, self.plan, self.num_slides)
+
+    def __setstate__(self, state):
+        self.topic, self.requirements, self.slides, self.plan, self.num_slides = state
+
+    def __len__(self) -> int:
+        return len(self.slides)
+
+    def __iter__(self) -> Iterator[Slide]:
+        return iter(self.slides)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Deck):
+            return NotImplemented
+        return self.__getstate__() == other.__getstate__()
+
+    def __repr__(self) -> str:
+        return f"Deck(topic={self.topic!r}, slides={len(self.slides)})"
@@ -0,0 +1,163 @@
+from functools import lru_cache
+from typing import List, Optional, Sequence, Set, Tuple
+
+from instrumentation import instrumentation, logger
+
+# Maps a requested slide budget to the slides worth building and the agent outputs
+# those slides read, so the research and analyst agents only compute what is used.
+
+class SlideSpec:
+    """
+    One kind of slide the organizer can build.
+
+    priority decides which slides survive a small budget (lower is kept first);
+    research and analysis name the agent output fields the slide reads; inputs names the
+    request inputs its own text uses; expansion slides are only added when the budget
+    exceeds the standard deck.
+    """
+
+    __slots__ = ("key", "builder", "priority", "research", "analysis", "inputs", "needs_requirements", "expansion")
+
+    def __init__(self, key: str, priority: int, research: Sequence[str] = (), analysis: Sequence[str] = (),
+                 inputs: Sequence[str] = ("topic",), needs_requirements: bool = False, expansion: bool = False):
+        self.key = key
+        self.builder = f"_slide_{key}"
+        self.priority = priority
+        self.research = tuple(research)
+        self.analysis = tuple(analysis)
+        self.inputs = frozenset(inputs)
+        self.needs_requirements = needs_requirements
+        self.expansion = expansion
+
+    def __repr__(self) -> str:
+        return f"SlideSpec({self.key!r})"
+
+# Presentation order; the closing slide always comes last
+SLIDE_SPECS: Tuple[SlideSpec, ...] = (
+    SlideSpec("title", 0),
+    SlideSpec("executive_summary", 2, research=("overview",)),
+    SlideSpec("market_trends", 6, research=("current_trends",)),
+    SlideSpec("strategic_insights", 5, analysis=("key_insights",)),
+    SlideSpec("opportunities_challenges", 7, research=("opportunities", "challenges")),
+    SlideSpec("recommendations", 3, analysis=("strategic_recommendations",)),
+    SlideSpec("implementation", 8),
+    SlideSpec("risk_management", 9, analysis=("risk_assessment",)),
+    SlideSpec("success_factors", 10, analysis=("success_factors",)),
+    SlideSpec("custom_requirements", 4, research=("requirement_analysis",), inputs=("topic", "requirements"),
+              needs_requirements=True),
+    SlideSpec("market_landscape", 11, research=("market_data",), expansion=True),
+    SlideSpec("key_challenges", 12, research=("challenges",), expansion=True),
+    SlideSpec("closing", 1, inputs=()),
+)
+
+SLIDE_SPECS_BY_KEY = {spec.key: spec for spec in SLIDE_SPECS}
+
+# Request inputs each agent output field is computed from
+RESEARCH_FIELD_INPUTS = {
+    "overview": frozenset(("topic",)),
+    "current_trends": frozenset(("topic",)),
+    "market_data": frozenset(("topic",)),
+    "challenges": frozenset(("topic",)),
+    "opportunities": frozenset(("topic",)),
+    "custom_focus": frozenset(("requirements",)),
+    "requirement_analysis": frozenset(("topic", "requirements"))
+}
+
+ANALYSIS_FIELD_INPUTS = {
+    "key_insights": frozenset(("topic",)),
+    "strategic_recommendations": frozenset(("topic",)),
+    "risk_assessment": frozenset(("topic",)),
+    "success_factors": frozenset(("topic",))
+}
+
+def slide_dependencies(spec: SlideSpec) -> frozenset:
+    """Every request input a slide depends on, directly or through the agent fields it reads"""
+    inputs = set(spec.inputs)
+    for field in spec.research:
+        inputs |= RESEARCH_FIELD_INPUTS.get(field, frozenset(("topic", "requirements")))
+    for field in spec.analysis:
+        inputs |= ANALYSIS_FIELD_INPUTS.get(field, frozenset(("topic", "requirements")))
+    return frozenset(inputs)
+
+# agent_source label the organizer gives each kind of slide
+_KEYS_BY_AGENT_SOURCE = {
+    "Content Organizer - Presentation Structure": "title",
+    "Research Specialist & Content Analyst Synthesis": "executive_summary",
+    "Research Specialist - Market Intelligence": "market_trends",
+    "Content Analyst - Strategic Intelligence": "strategic_insights",
+    "Research Specialist - Opportunity Assessment": "opportunities_challenges",
+    "Content Analyst - Strategic Planning": "recommendations",
+    "Content Organizer - Implementation Planning": "implementation",
+    "Content Analyst - Risk Assessment": "risk_management",
+    "Content Analyst - Success Framework": "success_factors",
+    "Research Specialist - Custom Requirements Analysis": "custom_requirements",
+    "Research Specialist - Market Data": "market_landscape",
+    "Research Specialist - Challenge Assessment": "key_challenges",
+    "PPT Designer - Presentation Conclusion": "closing"
+}
+
+def infer_plan(agent_sources: Sequence[Optional[str]]) -> Optional[Tuple[str, ...]]:
+    """
+    Recover the plan keys of a deck that was stored without them, from each slide's
+    agent_source label. Returns None if any slide cannot be matched.
+    """
+    keys = []
+    for source in agent_sources:
+        key = _KEYS_BY_AGENT_SOURCE.get(source)
+        if key is None:
+            return None
+        keys.append(key)
+    return tuple(keys)
+
+def has_requirements(requirements: str) -> bool:
+    return bool(requirements and requirements.strip())
+
+def plan_slides(num_slides: Optional[int] = None, requirements: str = "") -> Tuple[SlideSpec, ...]:
+    """
+    Choose the slides for a deck of num_slides, in presentation order.
+
+    None gives the standard deck (every non-expansion slide). Smaller budgets keep the
+    highest-priority slides; larger ones add expansion slides until the budget or the
+    available slides (see max_slides()) run out, and the shortfall is reported.
+    """
+    plan = _plan(num_slides, has_requirements(requirements))
+    if num_slides is not None and len(plan) < num_slides:
+        instrumentation.count("slide_budget_shortfall", num_slides - len(plan))
+    return plan
+
+def max_slides(requirements: str = "") -> int:
+    """The most slides a deck can have; larger budgets are capped to this"""
+    with_requirements = has_requirements(requirements)
+    return sum(1 for spec in SLIDE_SPECS if not spec.needs_requirements or with_requirements)
+
+# Plans depend only on the budget and whether requirements are present, so they are memoized
+@lru_cache(maxsize=256)
+def _plan(num_slides: Optional[int], with_requirements: bool) -> Tuple[SlideSpec, ...]:
+    candidates = [spec for spec in SLIDE_SPECS if not spec.needs_requirements or with_requirements]
+    standard = [spec for spec in candidates if not spec.expansion]
+    if num_slides is None or num_slides == len(standard):
+        return tuple(standard)
+    if num_slides < 1:
+        raise ValueError("num_slides must be at least 1")
+
+    pool = standard if num_slides < len(standard) else candidates
+    if num_slides > len(candidates):
+        # Logged once per budget, since plans are memoized
+        logger.warning("A deck has at most %d slides%s; a budget of %d gets %d",
+                       len(candidates), "" if with_requirements else " without requirements",
+                       num_slides, len(candidates))
+    chosen: Set[str] = {spec.key for spec in sorted(pool, key=lambda spec: spec.priority)[:num_slides]}
+    return tuple(spec for spec in candidates if spec.key in chosen)
+
+def required_fields(plan: Sequence[SlideSpec]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Return the research and analysis fields the planned slides read, without duplicates"""
+    return _required_fields(tuple(plan))
+
+@lru_cache(maxsize=256)
+def _required_fields(plan: Tuple[SlideSpec, ...]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    research: List[str] = []
+    analysis: List[str] = []
+    for spec in plan:
+        research.extend(field for field in spec.research if field not in research)
+        analysis.extend(field for field in spec.analysis if field not in analysis)
+    return tuple(research), tuple(analysis)
@@ -0,0 +1,263 @@
+import hashlib
+import json
+import sqlite3
+import struct
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from slide_model import Deck, Slide
+
+# Content-addressed archive for generated decks. Nearly every string the organizer emits
+# is fixed text or a template with only the topic (and requirements) filled in, so each
+# string is stored once as a template, keyed by its hash, with the deck's topic and
+# requirements swapped out for placeholders. Slides are stored once as lists of block
+# references, and decks as packed arrays of slide references.
+
+_TOPIC_MARK = "\x00"
+_REQUIREMENTS_MARK = "\x01"
+# Prefixes text that already contains a placeholder character and is stored verbatim
+_LITERAL_MARK = "\x02"
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS blocks (id INTEGER PRIMARY KEY, hash BLOB NOT NULL UNIQUE, text TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS slides (id INTEGER PRIMARY KEY, hash BLOB NOT NULL UNIQUE, record TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS decks (id INTEGER PRIMARY KEY, topic TEXT NOT NULL, requirements TEXT NOT NULL, "
+    "plan TEXT, num_slides INTEGER, slides BLOB NOT NULL, slide_ids TEXT)",
+)
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+def _template(text: str, topic: str, requirements: str) -> str:
+    """Replace the deck's inputs with placeholders; _render(_template(text)) == text always holds"""
+    if _TOPIC_MARK in text or _REQUIREMENTS_MARK in text or text.startswith(_LITERAL_MARK):
+        return _LITERAL_MARK + text
+    if topic and _REQUIREMENTS_MARK not in topic:
+        text = text.replace(topic, _TOPIC_MARK)
+    if requirements and _TOPIC_MARK not in requirements:
+        text = text.replace(requirements, _REQUIREMENTS_MARK)
+    return text
+
+def _render(template: str, topic: str, requirements: str) -> str:
+    if template.startswith(_LITERAL_MARK):
+        return template[1:]
+    if _REQUIREMENTS_MARK in template:
+        template = template.replace(_REQUIREMENTS_MARK, requirements)
+    if _TOPIC_MARK in template:
+        template = template.replace(_TOPIC_MARK, topic)
+    return template
+
+def _pack_refs(refs: Sequence[int]) -> bytes:
+    return struct.pack(f"<{len(refs)}I", *refs)
+
+def _unpack_refs(data: bytes) -> Tuple[int, ...]:
+    return struct.unpack(f"<{len(data) // 4}I", data)
+
+class SlideStore:
+    """
+    Deduplicating deck archive in a SQLite file (":memory:" keeps it in-process).
+
+    put_decks() writes a batch in one transaction and returns the new deck ids;
+    get_deck()/get_decks() reassemble them. Block and slide rows are cached in memory
+    once seen, so bulk writes and reads only touch the database for new content.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._lock = threading.Lock()
+        self._block_ids: Dict[bytes, int] = {}
+        self._slide_ids: Dict[bytes, int] = {}
+        self._block_texts: Dict[int, str] = {}
+        self._slide_records: Dict[int, List[Any]] = {}
+
+    def _resolve(self, table: str, ids: Dict[bytes, int], values: Dict[bytes, str]) -> Dict[bytes, int]:
+        """Map content hashes to row ids, inserting the rows that are not stored yet"""
+        missing = [digest for digest in values if digest not in ids]
+        self._fetch_ids(table, ids, missing)
+        new = [(digest, values[digest]) for digest in missing if digest not in ids]
+        if new:
+            column = "text" if table == "blocks" else "record"
+            self._db.executemany(f"INSERT OR IGNORE INTO {table} (hash, {column}) VALUES (?, ?)", new)
+            self._fetch_ids(table, ids, [digest for digest, _ in new])
+        return ids
+
+    def _fetch_ids(self, table: str, ids: Dict[bytes, int], digests: List[bytes]):
+        for start in range(0, len(digests), _QUERY_CHUNK):
+            chunk = digests[start:start + _QUERY_CHUNK]
+            ids.update(self._db.execute(
+                f"SELECT hash, id FROM {table} WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            ))
+
+    def _slide_record(self, slide: Slide, topic: str, requirements: str, blocks: Dict[bytes, str]) -> List[Any]:
+        def ref(text: Optional[str]) -> Any:
+            if text is None:
+                return None
+            template = _template(text, topic, requirements)
+            digest = _digest(template)
+            blocks[digest] = template
+            return digest
+
+        return [
+            ref(slide.title), ref(slide.subtitle), [ref(line) for line in slide.content],
+            ref(slide.slideType), ref(slide.layout), [ref(image) for image in slide.images],
+            ref(slide.agent_source), ref(slide.design_notes), ref(slide.visual_elements),
+            slide.extra
+        ]
+
+    def put_deck(self, deck: Deck) -> int:
+        return self.put_decks([deck])[0]
+
+    def put_decks(self, decks: Iterable[Deck]) -> List[int]:
+        """Store a batch of decks in one transaction, returning their ids in order"""
+        decks = list(decks)
+        blocks: Dict[bytes, str] = {}
+        records = [[self._slide_record(slide, deck.topic, deck.requirements, blocks) for slide in deck.slides]
+                   for deck in decks]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                block_ids = self._resolve("blocks", self._block_ids, blocks)
+
+                def encode(value: Any) -> Any:
+                    if isinstance(value, bytes):
+                        return block_ids[value]
+                    if isinstance(value, list):
+                        return [encode(item) for item in value]
+                    return value
+
+                slides: Dict[bytes, str] = {}
+                deck_refs = []
+                for deck_records in records:
+                    refs = []
+                    for record in deck_records:
+                        encoded = json.dumps(encode(record), separators=(",", ":"))
+                        digest = _digest(encoded)
+                        slides[digest] = encoded
+                        refs.append(digest)
+                    deck_refs.append(refs)
+                slide_ids = self._resolve("slides", self._slide_ids, slides)
+
+                deck_ids = []
+                for deck, refs in zip(decks, deck_refs):
+                    positions = [slide.id for slide in deck.slides]
+                    cursor = self._db.execute(
+                        "INSERT INTO decks (topic, requirements, plan, num_slides, slides, slide_ids) VALUES (?, ?, ?, ?, ?, ?)",
+                        (deck.topic, deck.requirements,
+                         json.dumps(list(deck.plan)) if deck.plan is not None else None, deck.num_slides,
+                         _pack_refs([slide_ids[digest] for digest in refs]),
+                         # Slide ids normally follow position; only store them when they do not
+                         None if positions == list(range(len(positions))) else json.dumps(positions))
+                    )
+                    deck_ids.append(cursor.lastrowid)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # Rows inserted by the rolled-back transaction no longer exist
+                self._block_ids.clear()
+                self._slide_ids.clear()
+                raise
+        return deck_ids
+
+    def _load(self, table: str, column: str, cache: Dict[int, Any], ids: Iterable[int], decode=None):
+        missing = list({row_id for row_id in ids if row_id not in cache})
+        for start in range(0, len(missing), _QUERY_CHUNK):
+            chunk = missing[start:start + _QUERY_CHUNK]
+            for row_id, value in self._db.execute(
+                f"SELECT id, {column} FROM {table} WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                cache[row_id] = decode(value) if decode else value
+
+    def get_deck(self, deck_id: int) -> Deck:
+        deck = self.get_decks([deck_id])[0]
+        if deck is None:
+            raise KeyError(deck_id)
+        return deck
+
+    def get_decks(self, deck_ids: Sequence[int]) -> List[Optional[Deck]]:
+        """Reassemble decks by id, in order; unknown ids give None"""
+        rows: Dict[int, Tuple] = {}
+        with self._lock:
+            for start in range(0, len(deck_ids), _QUERY_CHUNK):
+                chunk = list(deck_ids[start:start + _QUERY_CHUNK])
+                for row in self._db.execute(
+                    "SELECT id, topic, requirements, plan, num_slides, slides, slide_ids FROM decks "
+                    f"WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ):
+                    rows[row[0]] = row
+            return [self._assemble(rows[deck_id]) if deck_id in rows else None for deck_id in deck_ids]
+
+    def iter_decks(self, batch_size: int = 256) -> Iterator[Tuple[int, Deck]]:
+        """Yield (id, deck) for every stored deck in insertion order"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, topic, requirements, plan, num_slides, slides, slide_ids FROM decks "
+                    "WHERE id > ? ORDER BY id LIMIT ?", (last, batch_size)
+                ).fetchall()
+                decks = [(row[0], self._assemble(row)) for row in rows]
+            if not decks:
+                return
+            yield from decks
+            last = rows[-1][0]
+
+    def _assemble(self, row: Tuple) -> Deck:
+        _, topic, requirements, plan, num_slides, packed, positions = row
+        slide_refs = _unpack_refs(packed)
+        self._load("slides", "record", self._slide_records, slide_refs, json.loads)
+        records = [self._slide_records[ref] for ref in slide_refs]
+        self._load("blocks", "text", self._block_texts,
+                   (ref for record in records for ref in _block_refs(record)))
+        texts = self._block_texts
+
+        def text(ref: Optional[int]) -> Optional[str]:
+            return None if ref is None else _render(texts[ref], topic, requirements)
+
+        positions = json.loads(positions) if positions else range(len(records))
+        slides = [
+            Slide(id=position, title=text(record[0]), subtitle=text(record[1]),
+                  content=[text(ref) for ref in record[2]], slideType=text(record[3]), layout=text(record[4]),
+                  images=[text(ref) for ref in record[5]], agent_source=text(record[6]),
+                  design_notes=text(record[7]), visual_elements=text(record[8]), extra=record[9])
+            for position, record in zip(positions, records)
+        ]
+        return Deck(topic, requirements, slides, plan=json.loads(plan) if plan else None, num_slides=num_slides)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("decks", "slides", "blocks")}
+            counts["slide_refs"] = self._db.execute("SELECT COALESCE(SUM(LENGTH(slides)), 0) / 4 FROM decks").fetchone()[0]
+        return counts
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM decks").fetchone()[0]
+
+    def __enter__(self) -> "SlideStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+def _block_refs(record: List[Any]) -> Iterator[int]:
+    for index in (0, 1, 3, 4, 6, 7, 8):
+        if record[index] is not None:
+            yield record[index]
+    yield from record[2]
+    yield from record[5]
@@ -0,0 +1,74 @@
+import collections
+import json
+import os
+import tempfile
+import unittest
+import zlib
+
+from crew_ai import generate_presentations_batch
+
+TOPICS = [(f"Topic {n}", f"req {n}") for n in range(240)]
+
+
+def journal_records(path):
+    """The (deck key, stage) of every intact record in a journal"""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            checksum, _, payload = line.rstrip(b"\n").partition(b" ")
+            if payload and int(checksum, 16) == zlib.crc32(payload):
+                _, key, stage, _ = json.loads(payload)
+                records.append((key, stage))
+    return records
+
+
+class BatchResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.journal = os.path.join(self.directory.name, "batch.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_batch(self, executor):
+        return generate_presentations_batch(TOPICS, max_workers=8, executor=executor, chunksize=4,
+                                            journal_path=self.journal, job_id="test")
+
+    def assert_resumes(self, executor):
+        fresh = self.run_batch(executor)
+        self.assertEqual([result["error"] for result in fresh], [None] * len(TOPICS))
+        records = journal_records(self.journal)
+        stages = len(records) // len(TOPICS)
+        self.assertEqual(len(records), stages * len(TOPICS))
+        self.assertEqual(collections.Counter(records).most_common(1)[0][1], 1)
+
+        # Crash partway through: keep a third of the journal, tearing its last record
+        with open(self.journal, "r+b") as f:
+            f.truncate(os.path.getsize(self.journal) // 3)
+        self.assertEqual(self.run_batch(executor), fresh)
+        records = journal_records(self.journal)
+        self.assertEqual(len(set(records)), stages * len(TOPICS))
+        self.assertEqual(len(records), len(set(records)))
+
+    def test_thread_executor_resumes(self):
+        self.assert_resumes("thread")
+
+    def test_serial_executor_resumes(self):
+        self.assert_resumes("serial")
+
+    def test_process_executor_resumes(self):
+        self.assert_resumes("process")
+
+    def test_repeated_topic_is_checkpointed_once(self):
+        topics = ["AI", ("Cloud", "cost"), " AI ", "AI"]
+        results = generate_presentations_batch(topics, executor="serial", journal_path=self.journal, job_id="test")
+        self.assertEqual([result["topic"] for result in results], ["AI", "Cloud", " AI ", "AI"])
+        self.assertEqual(results[2]["slides"], results[0]["slides"])
+        self.assertIsNot(results[3]["slides"], results[0]["slides"])
+        records = journal_records(self.journal)
+        self.assertEqual(len(records), len(set(records)))
+        self.assertEqual(len({key for key, _ in records}), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
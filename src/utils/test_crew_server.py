@@ -0,0 +1,148 @@
+import json
+import os
+import signal
+import socket
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from crew_ai import PPTGeneratorCrew, generate_presentations_batch
+from crew_server import OVERLOADED, REQUEST_CANCELLED, CrewServer, serve_unix
+
+
+class BlockingCrew(PPTGeneratorCrew):
+    """A crew whose generate_presentation waits until released"""
+
+    def __init__(self):
+        super().__init__(verbose=False)
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+
+    def generate_presentation(self, topic, requirements="", num_slides=None):
+        self.started.release()
+        self.release.wait(5)
+        return [{"title": topic}]
+
+
+def request(request_id, method, **params):
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}) + "\n"
+
+
+class CancelScopeTest(unittest.TestCase):
+    def setUp(self):
+        self.crew = BlockingCrew()
+        self.server = CrewServer(self.crew, max_workers=1)
+
+    def tearDown(self):
+        self.crew.release.set()
+        self.server.coordinator.close()
+
+    def submit(self, session, line):
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(json.loads(self.server.handle_line(line, session))))
+        thread.start()
+        return thread, responses
+
+    def test_request_ids_are_scoped_to_their_session(self):
+        first, first_responses = self.submit("a", request(1, "generate", topic="A"))
+        self.assertTrue(self.crew.started.acquire(timeout=5))
+        second, second_responses = self.submit("b", request(1, "generate", topic="B"))
+
+        other = json.loads(self.server.handle_line(request(2, "cancel", id=1), "c"))
+        self.assertEqual(other["result"], {"cancelled": False})
+        own = json.loads(self.server.handle_line(request(2, "cancel", id=1), "b"))
+        self.assertEqual(own["result"], {"cancelled": True})
+        second.join(5)
+        self.assertEqual(second_responses[0]["error"]["code"], REQUEST_CANCELLED)
+
+        self.crew.release.set()
+        first.join(5)
+        self.assertEqual(first_responses[0]["result"], [{"title": "A"}])
+
+
+class BatchTest(unittest.TestCase):
+    def test_batch_matches_the_pipeline(self):
+        server = CrewServer(PPTGeneratorCrew(verbose=False), max_workers=1)
+        self.addCleanup(server.coordinator.close)
+        topics = ["AI in Health", ["Cloud", "cost"]]
+        self.assertEqual(server.generate_batch(topics, "scale", 5),
+                         generate_presentations_batch(topics, "scale", 5, executor="serial"))
+
+    def test_batch_waits_in_the_bounded_queue(self):
+        crew = BlockingCrew()
+        server = CrewServer(crew, max_workers=1, max_queue=1)
+        self.addCleanup(server.coordinator.close)
+        self.addCleanup(crew.release.set)
+        busy = threading.Thread(target=server.handle_line, args=(request(1, "generate", topic="A"),))
+        busy.start()
+        self.assertTrue(crew.started.acquire(timeout=5))
+        queued = server.coordinator.submit("B")
+        response = json.loads(server.handle_line(request(2, "generate_batch", topics=["C"])))
+        self.assertEqual(response["error"]["code"], OVERLOADED)
+        crew.release.set()
+        busy.join(5)
+        self.assertEqual(queued.result(5), [{"title": "B"}])
+
+    def test_failing_deck_does_not_fail_the_batch(self):
+        crew = PPTGeneratorCrew(verbose=False)
+        generate_deck = crew.generate_deck
+
+        def fail_on_bad(topic, *args, **kwargs):
+            if topic == "bad":
+                raise RuntimeError("boom")
+            return generate_deck(topic, *args, **kwargs)
+
+        crew.generate_deck = fail_on_bad
+        crew.generate_decks = mock.Mock(side_effect=RuntimeError("boom"))
+        server = CrewServer(crew, max_workers=1)
+        self.addCleanup(server.coordinator.close)
+        good, bad = server.generate_batch(["good", "bad"])
+        self.assertIsNone(good["error"])
+        self.assertTrue(good["slides"])
+        self.assertEqual(bad["error"], "RuntimeError: boom")
+
+
+class UnixSocketTest(unittest.TestCase):
+    def test_client_cancels_its_own_in_flight_request(self):
+        crew = BlockingCrew()
+        server = CrewServer(crew, max_workers=2)
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "crew.sock")
+        serving = threading.Thread(target=self._serve_without_signals, args=(server, path))
+        serving.start()
+        try:
+            client = socket.socket(socket.AF_UNIX)
+            for _ in range(100):
+                try:
+                    client.connect(path)
+                    break
+                except (FileNotFoundError, ConnectionRefusedError):
+                    threading.Event().wait(0.05)
+            reader = client.makefile("r")
+            client.sendall(request(1, "generate", topic="A").encode("utf-8"))
+            self.assertTrue(crew.started.acquire(timeout=5))
+            client.sendall(request(2, "cancel", id=1).encode("utf-8"))
+            responses = {response["id"]: response for response in (json.loads(reader.readline()) for _ in range(2))}
+            self.assertEqual(responses[2]["result"], {"cancelled": True})
+            self.assertEqual(responses[1]["error"]["code"], REQUEST_CANCELLED)
+
+            client.sendall(request(3, "shutdown").encode("utf-8"))
+            self.assertEqual(json.loads(reader.readline())["result"], {"status": "stopping"})
+            client.close()
+        finally:
+            crew.release.set()
+            serving.join(10)
+            server.coordinator.close()
+            directory.cleanup()
+        self.assertFalse(serving.is_alive())
+
+    @staticmethod
+    def _serve_without_signals(server, path):
+        # serve_unix installs signal handlers, which only the main thread may do
+        with mock.patch.object(signal, "signal", lambda signum, handler: None):
+            serve_unix(server, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
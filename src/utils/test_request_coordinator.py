@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+from concurrent.futures import CancelledError
+
+from request_coordinator import DeadlineExceeded, GenerationCoordinator, Overloaded
+
+
+class Compute:
+    """Records each call and blocks until released"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Semaphore(0)
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, topic, requirements, num_slides):
+        with self._lock:
+            self.calls.append(topic)
+        self.started.release()
+        self.release.wait(5)
+        if topic == "fail":
+            raise RuntimeError("boom")
+        return f"deck:{topic}"
+
+
+class CoordinatorTest(unittest.TestCase):
+    def setUp(self):
+        self.compute = Compute()
+        self.coordinator = GenerationCoordinator(self.compute, max_workers=1, max_queue=2)
+
+    def tearDown(self):
+        self.compute.release.set()
+        self.coordinator.close()
+
+    def occupy_worker(self):
+        """Submit a request that keeps the only worker busy until released"""
+        ticket = self.coordinator.submit("busy")
+        self.assertTrue(self.compute.started.acquire(timeout=5))
+        return ticket
+
+    def test_identical_requests_share_one_computation(self):
+        busy = self.occupy_worker()
+        first = self.coordinator.submit("AI", "cost")
+        second = self.coordinator.submit("  AI ", "cost ")
+        self.assertFalse(first.coalesced)
+        self.assertTrue(second.coalesced)
+        self.compute.release.set()
+        self.assertEqual(first.result(5), "deck:AI")
+        self.assertEqual(second.result(5), "deck:AI")
+        self.assertEqual(busy.result(5), "deck:busy")
+        self.assertEqual(self.compute.calls, ["busy", "AI"])
+        self.assertEqual(self.coordinator.snapshot()["coalesced"], 1)
+
+    def test_failure_reaches_every_waiter(self):
+        first = self.coordinator.submit("fail")
+        second = self.coordinator.submit("fail")
+        self.compute.release.set()
+        for ticket in (first, second):
+            with self.assertRaises(RuntimeError):
+                ticket.result(5)
+        self.assertEqual(self.coordinator.snapshot()["failed"], 1)
+
+    def test_full_queue_sheds_less_important_work(self):
+        self.occupy_worker()
+        low = self.coordinator.submit("low", priority=5)
+        self.coordinator.submit("normal", priority=1)
+        urgent = self.coordinator.submit("urgent", priority=0)
+        with self.assertRaises(Overloaded):
+            low.result(5)
+        with self.assertRaises(Overloaded):
+            self.coordinator.submit("later", priority=9)
+        self.compute.release.set()
+        self.assertEqual(urgent.result(5), "deck:urgent")
+        stats = self.coordinator.snapshot()
+        self.assertEqual((stats["shed"], stats["rejected"]), (1, 1))
+
+    def test_lower_priority_values_run_first(self):
+        self.occupy_worker()
+        later = self.coordinator.submit("later", priority=3)
+        sooner = self.coordinator.submit("sooner", priority=1)
+        self.compute.release.set()
+        later.result(5)
+        sooner.result(5)
+        self.assertEqual(self.compute.calls, ["busy", "sooner", "later"])
+
+    def test_deadline_rejected_at_admission(self):
+        self.coordinator.service_time = 10.0
+        with self.assertRaises(DeadlineExceeded):
+            self.coordinator.submit("slow", timeout=1)
+        self.assertEqual(self.coordinator.snapshot()["rejected"], 1)
+
+    def test_request_expires_in_the_queue(self):
+        self.occupy_worker()
+        ticket = self.coordinator.submit("stale", timeout=0.05)
+        with self.assertRaises(DeadlineExceeded):
+            ticket.result()
+        time.sleep(0.1)
+        self.compute.release.set()
+        self.coordinator.close()
+        self.assertNotIn("stale", self.compute.calls)
+
+    def test_cancel_drops_work_nobody_waits_for(self):
+        self.occupy_worker()
+        ticket = self.coordinator.submit("unwanted")
+        self.assertTrue(ticket.cancel())
+        with self.assertRaises(CancelledError):
+            ticket.result(5)
+        self.compute.release.set()
+        self.coordinator.close()
+        self.assertEqual(self.compute.calls, ["busy"])
+        self.assertEqual(self.coordinator.snapshot()["queued"], 0)
+
+    def test_cancel_keeps_work_another_ticket_needs(self):
+        self.occupy_worker()
+        first = self.coordinator.submit("shared")
+        second = self.coordinator.submit("shared")
+        self.assertTrue(first.cancel())
+        self.compute.release.set()
+        self.assertEqual(second.result(5), "deck:shared")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from crew_ai import PPTGeneratorCrew
+from result_cache import ResultCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MergedFieldExpiryTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch("result_cache.time.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_update_keeps_the_oldest_creation_time(self):
+        for path in (None, os.path.join(self.directory.name, "cache.db")):
+            cache = ResultCache(ttl=1, path=path)
+            cache.update("key", {"overview": "old"})
+            self.clock.now += 0.7
+            cache.update("key", {"trends": "new"})
+            self.assertEqual(cache.get("key"), {"overview": "old", "trends": "new"})
+            self.clock.now += 0.7
+            self.assertIsNone(cache.get("key"))
+            cache.close()
+
+    def test_small_deck_does_not_reuse_an_expired_field(self):
+        crew = PPTGeneratorCrew(verbose=False, cache=ResultCache(ttl=1))
+        computed = []
+        research = crew._research_findings
+
+        def record(topic, requirements, fields):
+            computed.append(tuple(fields))
+            return research(topic, requirements, fields)
+
+        crew._research_findings = record
+        crew.generate_presentation("AI", "", 3)
+        self.clock.now += 0.7
+        crew.generate_presentation("AI", "")
+        self.clock.now += 0.7
+        crew.generate_presentation("AI", "", 3)
+        self.assertEqual(len(computed), 3)
+        self.assertEqual(computed[2], computed[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
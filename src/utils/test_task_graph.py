@@ -0,0 +1,52 @@
+import threading
+import unittest
+
+from crew_ai import MockCrew, PPTGeneratorCrew, run_task_graph
+
+
+class RunTaskGraphTest(unittest.TestCase):
+    def test_task_starts_when_its_own_context_is_done(self):
+        # Two tracks, 0 -> 2 and 1 -> 3, joined by 4; track 1 only finishes once 2 has started
+        second_started = threading.Event()
+        order = []
+
+        def execute(i):
+            if i == 1:
+                self.assertTrue(second_started.wait(5), "task 2 waited for the other track")
+            if i == 2:
+                second_started.set()
+            order.append(i)
+
+        self.assertEqual(run_task_graph([[], [], [0], [1], [2, 3]], execute), 5)
+        self.assertEqual(order[-1], 4)
+        self.assertLess(order.index(2), order.index(1))
+
+    def test_only_selected_tasks_run(self):
+        ran = []
+        run_task_graph([[], [0], [1]], ran.append, tasks=[1, 2])
+        self.assertEqual(ran, [1, 2])
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValueError):
+            run_task_graph([[1], [0]], lambda i: None)
+
+    def test_failure_propagates(self):
+        def execute(i):
+            if i == 1:
+                raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            run_task_graph([[], [], [0, 1]], execute)
+
+
+class KickoffTest(unittest.TestCase):
+    def test_kickoff_matches_generate_presentation(self):
+        crew = PPTGeneratorCrew(verbose=False)
+        agents = list(crew.create_agents())
+        tasks = crew.create_tasks("AI in Health", "cost", *agents)
+        slides = MockCrew(agents, tasks).kickoff()
+        self.assertEqual([slide.to_dict() for slide in slides], crew.generate_presentation("AI in Health", "cost"))
+
+
+if __name__ == "__main__":
+    unittest.main()